@@ -0,0 +1,183 @@
+# app/blocks.py
+# Server-side twin of render() in admin_static/blocks-renderer.js: same markup,
+# byte for byte, for the same blocks. Whitespace inside the templates is copied
+# from the JS template literals on purpose - keep the two in step when editing
+# either one (scripts/check_blocks_parity.py compares them under node).
+import json
+import math
+from typing import Any, List
+
+def _truthy(v: Any) -> bool:
+    # JS truthiness: [] and {} are truthy, 0 / "" / null / NaN are not
+    if v is None or v is False:
+        return False
+    if isinstance(v, (int, float)):
+        return v != 0 and not (isinstance(v, float) and math.isnan(v))
+    if isinstance(v, str):
+        return v != ""
+    return True
+
+def _or(v: Any, default: Any) -> Any:
+    return v if _truthy(v) else default
+
+def _number(v: Any) -> float:
+    # JS Number(v)
+    if isinstance(v, bool):
+        return 1 if v else 0
+    if isinstance(v, (int, float)):
+        return v
+    if isinstance(v, str):
+        s = v.strip()
+        if not s:
+            return 0
+        try:
+            return float(s)
+        except ValueError:
+            return math.nan
+    return math.nan
+
+def _num_str(n: float) -> str:
+    if isinstance(n, float):
+        if math.isnan(n):
+            return "NaN"
+        if math.isinf(n):
+            return "Infinity" if n > 0 else "-Infinity"
+        if n.is_integer() and abs(n) < 1e21:
+            return str(int(n))
+    return repr(n)
+
+def _str(v: Any) -> str:
+    # JS String(v), as used by template literal interpolation
+    if isinstance(v, str):
+        return v
+    if v is None:
+        return "null"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, (int, float)):
+        return _num_str(v)
+    if isinstance(v, list):
+        return ",".join("" if x is None else _str(x) for x in v)
+    return "[object Object]"
+
+def _prop(obj: Any, key: str) -> Any:
+    return obj.get(key) if isinstance(obj, dict) else None
+
+def esc(s: Any) -> str:
+    s = _str(_or(s, ""))
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def img(url: Any, alt: Any = "") -> str:
+    url = _or(url, "")
+    return f'<img src="{esc(url)}" alt="{esc(alt)}" loading="lazy" />' if _truthy(url) else ""
+
+def _list(v: Any) -> list:
+    # (p.items||[]) - only lists can be iterated; validation keeps them lists
+    v = _or(v, [])
+    return v if isinstance(v, list) else []
+
+def _block(b: Any) -> str:
+    p = _or(_prop(b, "props"), {})
+    if not isinstance(p, dict):
+        p = {}
+    t = _prop(b, "type")
+    if t == "hero":
+        images = p.get("images")
+        sub = f'<p class="sub">{esc(p.get("subtitle"))}</p>' if _truthy(p.get("subtitle")) else ""
+        cta = (f'<a class="btn" href="{esc(p.get("ctaHref"))}">{esc(_or(p.get("ctaLabel"), "Get started"))}</a>'
+               if _truthy(p.get("ctaHref")) else "")
+        hero_img = (f'<div class="hero-img">{img(images[0], _or(p.get("title"), ""))}</div>'
+                    if isinstance(images, list) and images and _truthy(images[0]) else "")
+        return f"""
+          <section class="evo hero">
+            <div class="container">
+              <h1>{esc(_or(p.get("title"), ""))}</h1>
+              {sub}
+              {cta}
+            </div>
+            {hero_img}
+          </section>"""
+    if t == "text":
+        return f'<section class="evo text container">{_str(_or(p.get("html"), ""))}</section>'
+    if t == "image":
+        return f'<section class="evo image container">{img(p.get("src"), _or(p.get("alt"), ""))}</section>'
+    if t == "columns":
+        return f"""
+          <section class="evo cols container">
+            <div class="col">{_str(_or(p.get("left"), ""))}</div>
+            <div class="col">{_str(_or(p.get("right"), ""))}</div>
+          </section>"""
+    if t == "cta":
+        btn = (f'<a class="btn" href="{esc(p.get("href"))}">{esc(_or(p.get("button"), "Contact us"))}</a>'
+               if _truthy(p.get("href")) else "")
+        return f"""
+          <section class="evo cta">
+            <div class="container row">
+              <div class="cta-text">{esc(_or(p.get("text"), ""))}</div>
+              {btn}
+            </div>
+          </section>"""
+    if t == "features":
+        heading = f"<h2>{esc(p.get('heading'))}</h2>" if _truthy(p.get("heading")) else ""
+        items = "".join(f"<li>{esc(i)}</li>" for i in _list(p.get("items")))
+        return f"""
+          <section class="evo features container">
+            {heading}
+            <ul class="feat-grid">{items}</ul>
+          </section>"""
+    if t == "faq":
+        items = "".join(f"""
+              <details><summary>{esc(_or(_prop(q, "q"), ""))}</summary><div>{esc(_or(_prop(q, "a"), ""))}</div></details>
+            """ for q in _list(p.get("items")))
+        return f"""
+          <section class="evo faq container">
+            {items}
+          </section>"""
+    if t == "testimonials":
+        items = "".join(f"""
+              <figure>
+                {img(_prop(i, "image"), _or(_prop(i, "author"), "")) if _truthy(_prop(i, "image")) else ''}
+                <blockquote>{esc(_or(_prop(i, "quote"), ""))}</blockquote>
+                <figcaption>{esc(_or(_prop(i, "author"), ""))} <small>{esc(_or(_prop(i, "role"), ""))}</small></figcaption>
+              </figure>""" for i in _list(p.get("items")))
+        return f"""
+          <section class="evo testimonials container">
+            {items}
+          </section>"""
+    if t == "galleryStrip":
+        count = _number(_or(p.get("count"), 6))
+        end = 0 if math.isnan(count) else int(count) if not math.isinf(count) else (None if count > 0 else 0)
+        strip = "".join(img(u, "") for u in _list(p.get("images"))[:end])
+        return f"""
+          <section class="evo gallery container">
+            <div class="strip">{strip}</div>
+          </section>"""
+    if t == "spacer":
+        return f'<div style="height:{_num_str(_number(_or(p.get("size"), 40)))}px"></div>'
+    if t == "divider":
+        return '<hr class="evo divider" />'
+    if t == "map":
+        return (f'<section class="evo map container"><iframe src="{esc(_or(p.get("src"), ""))}" loading="lazy" '
+                'referrerpolicy="no-referrer-when-downgrade"></iframe></section>')
+    if t == "video":
+        return (f'<section class="evo video container"><iframe src="{esc(_or(p.get("src"), ""))}" loading="lazy" '
+                'allowfullscreen></iframe></section>')
+    if t == "form":
+        heading = f"<h2>{esc(p.get('heading'))}</h2>" if _truthy(p.get("heading")) else ""
+        return f"""
+          <section class="evo form container">
+            {heading}
+            <form onsubmit="return window.EvoLead && EvoLead.submit(event)">
+              <input name="name" placeholder="Name" required />
+              <input name="email" type="email" placeholder="Email" required />
+              <input name="phone" placeholder="Phone" />
+              <input name="postcode" placeholder="Postcode" />
+              <textarea name="message" placeholder="Tell us about your project"></textarea>
+              <button type="submit">Send</button>
+            </form>
+          </section>"""
+    return f'<section class="evo unknown container"><pre>{esc(json.dumps(b, indent=2, ensure_ascii=False))}</pre></section>'
+
+def render(blocks: List[Any]) -> str:
+    """HTML fragment for a page's blocks, identical to render() in blocks-renderer.js."""
+    return "".join(_block(b) for b in blocks)
@@ -0,0 +1,65 @@
+# app/images.py
+# Image derivatives for uploads (resized widths + WebP/AVIF), run in a worker
+# process by app.main. Kept free of app/DB imports so spawned workers start fast.
+import os
+import pathlib
+import warnings
+from typing import List
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover
+    Image = None
+
+# decoded size cap, sized to the worker memory budget (~4 bytes/pixel, plus resize copies);
+# larger images are refused from the header, before anything is decoded
+MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+if Image is not None:
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+MIME = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp", "avif": "image/avif"}
+QUALITY = {"jpeg": 82, "webp": 80, "avif": 60}
+
+def available() -> bool:
+    return Image is not None
+
+def extra_formats() -> List[str]:
+    # modern formats emitted alongside the original's format, if this Pillow can write them
+    Image.init()
+    return [f for f in ("webp", "avif") if f.upper() in Image.SAVE]
+
+def make_derivatives(src: str, out_dir: str, stem: str, widths: List[int]) -> dict:
+    """Write resized variants of src into out_dir and return a manifest dict.
+
+    Widths at or above the original width are skipped (no upscaling); the
+    original size is always included so every format has a full-size variant.
+    Raises if src is not a readable image or is larger than MAX_PIXELS.
+    """
+    out = pathlib.Path(out_dir)
+    with warnings.catch_warnings():
+        # Pillow only warns between MAX_IMAGE_PIXELS and twice that; refuse instead
+        warnings.simplefilter("error", Image.DecompressionBombWarning)
+        im = Image.open(src)
+    with im:
+        im = ImageOps.exif_transpose(im)
+        has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+        base_fmt = "png" if has_alpha else "jpeg"
+        im = im.convert("RGBA" if has_alpha else "RGB")
+        width, height = im.size
+        sizes = sorted({w for w in widths if 0 < w < width} | {width})
+        variants = []
+        for w in sizes:
+            h = max(1, round(height * w / width))
+            resized = im if w == width else im.resize((w, h), Image.LANCZOS)
+            for fmt in [base_fmt] + extra_formats():
+                ext = "jpg" if fmt == "jpeg" else fmt
+                name = f"{stem}-{w}w.{ext}"
+                params = {"quality": QUALITY[fmt]} if fmt in QUALITY else {"optimize": True}
+                if fmt == "jpeg":
+                    params.update(optimize=True, progressive=True)
+                resized.save(out / name, format=fmt.upper(), **params)
+                variants.append({
+                    "file": name, "width": w, "height": h, "type": MIME[fmt],
+                    "bytes": (out / name).stat().st_size,
+                })
+    return {"width": width, "height": height, "variants": variants}
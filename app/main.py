@@ -1,33 +1,91 @@
 # app/main.py
 # EvoHome FastAPI backend (simple JSON CMS – no drag/drop)
+# - Async DB layer (asyncpg / aiosqlite); handlers never block the loop on SQL
 # - Auth (JWT) + minimal in-memory rate limit
+# - In-process read cache for content singletons and pre-encoded
+#   (gzip/br) collection bodies (stats at /debug/cache)
+# - Strong ETags + If-None-Match/304 on public GETs
+# - /bootstrap: many singletons in one request (one IN query, cached)
 # - Content singletons (header, homepage, about, contact, footer, coverage,
 #   seo, forms, request-quote, chatbot, floating-buttons, etc.)
-# - Collections: services, blogs, gallery (bulk replace or upsert one)
-# - Lead form -> DB + SMTP email
-# - Image upload (Supabase Storage if configured, else /uploads)
-# - Seed from seed_data/ (singletons + arrays)
+# - Collections: services, blogs, gallery (bulk replace, diff sync with
+#   ?mode=diff, or upsert one)
+#   and ?category= / ?sort= / ?limit= + ?cursor= keyset pagination on the lists;
+#   ?fields= projection and ?view=card projections pre-built on write
+# - Lead form -> DB + outbox; emails sent by a background worker
+# - Image upload (Supabase Storage via a pooled async client, else /uploads)
+#   with resized/WebP derivatives built in a process pool
+# - Block pages at /pages/{slug} (validated on save, cached + ETagged), and
+#   pre-rendered HTML fragments at /pages/{slug}.html (app/blocks.py)
+# - /search over services + blogs (SQLite FTS5 / Postgres tsvector, else an
+#   in-process BM25 index), kept current by collection writes
+# - Seed from seed_data/ (singletons + arrays + pages/)
 # - Admin static at /admin
 # - Swagger at /docs
 
 import os
+import asyncio
+import base64
+import bisect
+import gzip
+import hashlib
 import json
+import logging
+import math
+import mimetypes
+import re
+import uuid
 import time
 import pathlib
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
+from html import escape as html_escape, unescape as html_unescape
 
 from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, EmailStr
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import NotModifiedResponse
+from pydantic import BaseModel, ConfigDict, EmailStr, ValidationError
 from jose import jwt
 from jose.exceptions import JWTError
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from sqlalchemy import delete, func, insert, select, text, tuple_, update, Column, Index, Integer, String, Text, DateTime
 from sqlalchemy import JSON as SAJSON  # works for sqlite; postgres will store as text
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import smtplib
-import requests
+import sqlite3
+import anyio
+import httpx
+
+try:
+    import brotli  # optional: br variants of cached bodies
+except ImportError:  # pragma: no cover
+    brotli = None
+
+from app import images
+from app.blocks import render as render_blocks
+
+try:
+    import orjson  # optional: fast JSON encoding for responses and cached bodies
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import redis.asyncio as aioredis  # optional: RATE_LIMIT_BACKEND=redis
+except ImportError:  # pragma: no cover
+    aioredis = None
 
 # -------------------------
 # Env
@@ -44,12 +102,49 @@ JWT_SECRET        = os.getenv("JWT_SECRET", "replace-this-with-a-long-random-str
 JWT_ALGO          = "HS256"
 JWT_EXPIRE_MIN    = int(os.getenv("JWT_EXPIRE_MINUTES", "360"))
 
+BOOTSTRAP_KEYS    = os.getenv("BOOTSTRAP_KEYS", "header,footer,seo,floating-buttons,chatbot,homepage_data,contact,coverage,forms").split(",")
+
 SMTP_HOST         = os.getenv("SMTP_HOST", "")
 SMTP_PORT         = int(os.getenv("SMTP_PORT", "587") or 587)
 SMTP_USER         = os.getenv("SMTP_USER", "")
 SMTP_PASS         = os.getenv("SMTP_PASS", "")
 EMAIL_FROM        = os.getenv("EMAIL_FROM", "no-reply@evohomeimprovements.co.uk")
 LEADS_TO_EMAIL    = os.getenv("LEADS_TO_EMAIL", "office@evohomeimprovements.co.uk")
+SMTP_USE_TLS      = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
+MAIL_POLL_SEC     = float(os.getenv("MAIL_POLL_SEC", "30"))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "8"))
+MAIL_DIGEST_SEC   = float(os.getenv("MAIL_DIGEST_SEC", "0"))  # >0: batch leads per window into one email
+SMTP_POOL_SIZE    = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_IDLE_SEC     = float(os.getenv("SMTP_IDLE_SEC", "60"))   # drop pooled connections idle longer than this
+
+# Connection pool (ignored for sqlite). Size it so workers * (size + overflow)
+# stays under the database's connection limit.
+DB_POOL_SIZE      = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW   = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT   = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE   = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING  = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+STORAGE_TIMEOUT_SEC = float(os.getenv("STORAGE_TIMEOUT_SEC", "30"))
+STORAGE_MAX_CONNECTIONS = int(os.getenv("STORAGE_MAX_CONNECTIONS", "10"))
+
+# JSON bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "500"))
+
+# Cache-Control for static mounts; uploads are content-addressed, so never change
+UPLOADS_CACHE_CONTROL    = os.getenv("UPLOADS_CACHE_CONTROL", "public, max-age=31536000, immutable")
+ADMIN_CACHE_CONTROL      = os.getenv("ADMIN_CACHE_CONTROL", "public, max-age=300")
+ADMIN_HTML_CACHE_CONTROL = os.getenv("ADMIN_HTML_CACHE_CONTROL", "no-cache")
+
+# largest ?limit= accepted by the collection lists
+COLLECTION_MAX_LIMIT = int(os.getenv("COLLECTION_MAX_LIMIT", "100"))
+
+UPLOAD_MAX_BYTES   = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(256 * 1024)))
+
+# resized variants generated per uploaded image (plus WebP/AVIF when supported)
+IMAGE_WIDTHS  = [int(w) for w in os.getenv("IMAGE_WIDTHS", "320,640,1024,1600").split(",") if w.strip()]
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
 
 UPLOADS_DIR = pathlib.Path("uploads")
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
@@ -57,7 +152,11 @@ UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 # -------------------------
 # App + CORS + static
 # -------------------------
-app = FastAPI(title="EvoHome Backend", version="1.1.0")
+app = FastAPI(
+    title="EvoHome Backend",
+    version="1.1.0",
+    default_response_class=ORJSONResponse if orjson else JSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -67,18 +166,119 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/admin", StaticFiles(directory="admin_static", html=True), name="admin")
-app.mount("/static/uploads", StaticFiles(directory="uploads"), name="uploads")
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with a Cache-Control policy and precompressed .br/.gz siblings.
+
+    If `foo.js.br` (or `.gz`) sits next to `foo.js` and the client accepts that
+    encoding, the sibling is sent as-is with Content-Encoding set.
+    """
+
+    def __init__(self, *args, cache_control: str = "", html_cache_control: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+        self.html_cache_control = html_cache_control or cache_control
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+        accepted = _parse_accept_encoding(request_headers.get("accept-encoding"))
+        headers = {}
+        siblings = False
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            try:
+                sibling_stat = os.stat(f"{full_path}{suffix}")
+            except OSError:
+                continue
+            siblings = True
+            if encoding in accepted and not headers:
+                full_path, stat_result = f"{full_path}{suffix}", sibling_stat
+                headers["Content-Encoding"] = encoding
+        if siblings:
+            headers["Vary"] = "Accept-Encoding"
+        policy = self.html_cache_control if media_type == "text/html" else self.cache_control
+        if policy:
+            headers["Cache-Control"] = policy
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result,
+                                media_type=media_type, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+app.mount("/admin", CachedStaticFiles(directory="admin_static", html=True,
+                                      cache_control=ADMIN_CACHE_CONTROL,
+                                      html_cache_control=ADMIN_HTML_CACHE_CONTROL), name="admin")
+app.mount("/static/uploads", CachedStaticFiles(directory="uploads", cache_control=UPLOADS_CACHE_CONTROL), name="uploads")
 
 # -------------------------
 # DB
 # -------------------------
+class PoolStats:
+    """Checkout counters and wait times for the engine's connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            n = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_total / n * 1000, 3) if n else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+POOL_STATS = PoolStats()
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # times how long each checkout waits for a free connection
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            POOL_STATS.record(time.perf_counter() - started, timed_out=True)
+            raise
+        POOL_STATS.record(time.perf_counter() - started)
+        return conn
+
+def _async_url(url: str) -> str:
+    # sync-style DATABASE_URL (as used by app/seed.py) -> async driver URL
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgres://", "postgresql://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            # asyncpg spells libpq's sslmode= as ssl=
+            return "postgresql+asyncpg://" + url[len(prefix):].replace("sslmode=", "ssl=")
+    return url
+
 Base = declarative_base()
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+if DATABASE_URL.startswith("sqlite"):
+    engine = create_async_engine(_async_url(DATABASE_URL))
+else:
+    engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 class Content(Base):
     __tablename__ = "content"
@@ -86,6 +286,13 @@ class Content(Base):
     key = Column(String(200), unique=True, index=True)
     data = Column(SAJSON, nullable=False)
 
+class CacheRevision(Base):
+    # per-scope write counter ("content", "pages", "<collection table>"), shared by
+    # all processes; a process that sees it move drops its cached bodies for the scope
+    __tablename__ = "cache_revisions"
+    scope = Column(String(50), primary_key=True)
+    rev = Column(Integer, nullable=False, default=0)
+
 class Lead(Base):
     __tablename__ = "leads"
     id = Column(Integer, primary_key=True)
@@ -95,29 +302,105 @@ class Lead(Base):
     message = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class Page(Base):
+    # block layouts rendered by admin_static/blocks-renderer.js
+    __tablename__ = "pages"
+    id = Column(Integer, primary_key=True)
+    slug = Column(String(200), unique=True, index=True)
+    data = Column(SAJSON, nullable=False)
+    html = Column(Text, nullable=True)  # pre-rendered at save (app/blocks.py)
+
+class OutboxEmail(Base):
+    # pending notification emails; the mail worker sends and marks them
+    __tablename__ = "email_outbox"
+    id = Column(Integer, primary_key=True)
+    to_addr = Column(String(200))
+    subject = Column(String(400))
+    body = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, index=True)
+    sent_at = Column(DateTime, nullable=True, index=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+
 class ServiceItem(Base):
     __tablename__ = "services"
     id = Column(Integer, primary_key=True)
     slug = Column(String(200), unique=True, index=True)
-    name = Column(String(300))
-    category = Column(String(200))
+    name = Column(String(300), nullable=False, default="")
+    category = Column(String(200), index=True)
     data = Column(SAJSON)
+    # keyset pages for ?sort=name, with and without ?category=
+    __table_args__ = (Index("ix_services_name_id", "name", "id"),
+                      Index("ix_services_category_name_id", "category", "name", "id"))
 
 class BlogPost(Base):
     __tablename__ = "blogs"
     id = Column(Integer, primary_key=True)
     slug = Column(String(200), unique=True, index=True)
-    title = Column(String(400))
+    title = Column(String(400), nullable=False, default="")
     data = Column(SAJSON)
+    __table_args__ = (Index("ix_blogs_title_id", "title", "id"),)
 
 class GalleryItem(Base):
     __tablename__ = "gallery"
     id = Column(Integer, primary_key=True)
-    title = Column(String(400))
-    category = Column(String(200))
+    title = Column(String(400), nullable=False, default="")
+    category = Column(String(200), index=True)
     data = Column(SAJSON)
+    __table_args__ = (Index("ix_gallery_title_id", "title", "id"),
+                      Index("ix_gallery_category_title_id", "category", "title", "id"))
+
+@app.on_event("startup")
+async def create_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that already exist, so add indexes declared later
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                await conn.run_sync(lambda c, index=index: index.create(c, checkfirst=True))
+        # sort columns are NOT NULL for new tables; older rows may still hold NULLs
+        for model, column in ((ServiceItem, "name"), (BlogPost, "title"), (GalleryItem, "title")):
+            col = getattr(model, column)
+            await conn.execute(update(model).where(col.is_(None)).values({column: ""}))
 
-Base.metadata.create_all(bind=engine)
+def _native_insert():
+    # dialect insert() that supports ON CONFLICT, or None (use select-then-write)
+    return {"postgresql": pg_insert, "sqlite": sqlite_insert}.get(engine.dialect.name)
+
+async def _bump_revision(db, scope: str) -> int:
+    # call inside the write's transaction, before commit; returns the new revision
+    ins = _native_insert()
+    if ins is not None:
+        stmt = ins(CacheRevision).values(scope=scope, rev=1)
+        await db.execute(stmt.on_conflict_do_update(index_elements=["scope"], set_={"rev": CacheRevision.rev + 1}))
+    else:
+        obj = await db.scalar(select(CacheRevision).where(CacheRevision.scope == scope))
+        if obj: obj.rev += 1
+        else: db.add(CacheRevision(scope=scope, rev=1))
+        await db.flush()
+    return await db.scalar(select(CacheRevision.rev).where(CacheRevision.scope == scope))
+
+async def _upsert_keyed(db, model, key_field: str, key: str, **values):
+    # rows with a unique key and replaceable columns: Content, Page
+    ins = _native_insert()
+    if ins is not None:
+        stmt = ins(model).values(**{key_field: key}, **values)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[key_field], set_={k: stmt.excluded[k] for k in values}))
+    else:
+        obj = await db.scalar(select(model).where(getattr(model, key_field) == key))
+        if obj:
+            for k, v in values.items():
+                setattr(obj, k, v)
+        else:
+            db.add(model(**{key_field: key}, **values))
+    rev = await _bump_revision(db, model.__tablename__)
+    await db.commit()
+    _note_revision(model.__tablename__, rev)
+
+async def _upsert_content(db, key: str, data: Any):
+    await _upsert_keyed(db, Content, "key", key, data=data)
 
 # -------------------------
 # Schemas
@@ -132,6 +415,25 @@ class LeadSchema(BaseModel):
     phone: Optional[str] = ""
     message: Optional[str] = ""
 
+class PageBlock(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    type: str
+    props: Dict[str, Any] = {}
+
+class PageSchema(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    blocks: List[PageBlock] = []
+
+# props the renderer iterates over; they must be lists when present
+PAGE_BLOCK_LIST_PROPS = {
+    "hero": ["images"],
+    "features": ["items"],
+    "faq": ["items"],
+    "testimonials": ["items"],
+    "galleryStrip": ["images"],
+    "serviceCards": ["items"],
+}
+
 # -------------------------
 # Auth helpers
 # -------------------------
@@ -157,23 +459,482 @@ def require_admin(request: Request):
     return True
 
 # -------------------------
-# Rate limit (simple in-memory)
+# Rate limit (in-memory sliding-window counter)
 # -------------------------
-RATE_BUCKET: Dict[str, List[float]] = {}
 POST_LIMIT_COUNT = int(os.getenv("RATE_LIMIT_COUNT", "30"))
 POST_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW_SEC", "60"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+# memory (per process) | sqlite (all processes on this host) | redis (all hosts)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "./ratelimit.db")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+class SlidingWindowLimiter:
+    """Per-client sliding-window counter: O(1) per check, bounded memory.
+
+    Each client keeps [window index, previous window count, current window count];
+    the previous window is weighted by how much of it still overlaps the sliding
+    window. Clients are kept in LRU order: idle ones (nothing in the last two
+    windows) are swept from the front, and the table never exceeds max_clients.
+    """
+
+    def __init__(self, limit: int = POST_LIMIT_COUNT, window: float = POST_LIMIT_WINDOW,
+                 max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.limit = limit
+        self.window = float(window)
+        self.max_clients = max(1, max_clients)
+        self._clients: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, now: Optional[float] = None) -> bool:
+        """Count one request for key; True if it is over the limit (and not counted)."""
+        now = time.time() if now is None else now
+        idx = int(now // self.window)
+        with self._lock:
+            clients = self._clients
+            st = clients.get(key)
+            if st is None:
+                st = clients[key] = [idx, 0, 0]
+                if len(clients) > self.max_clients:
+                    clients.popitem(last=False)
+            else:
+                clients.move_to_end(key)
+                if st[0] != idx:
+                    st[1] = st[2] if st[0] == idx - 1 else 0
+                    st[2] = 0
+                    st[0] = idx
+            # amortised O(1) sweep of idle clients at the LRU end
+            for _ in range(2):
+                oldest_key, oldest = next(iter(clients.items()))
+                if oldest[0] >= idx - 1 or oldest_key == key:
+                    break
+                clients.popitem(last=False)
+            overlap = 1.0 - (now - idx * self.window) / self.window
+            if st[1] * overlap + st[2] >= self.limit:
+                return True
+            st[2] += 1
+            return False
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+def _window_over_limit(prev: int, before: int, now: float, idx: int, window: float, limit: int) -> bool:
+    # same estimate as SlidingWindowLimiter; `before` excludes the current hit
+    overlap = 1.0 - (now - idx * window) / window
+    return prev * overlap + before >= limit
+
+class MemoryRateLimit:
+    """Per-process backend (the default)."""
+
+    def __init__(self, limiter: SlidingWindowLimiter):
+        self.limiter = limiter
+
+    async def setup(self):
+        pass
+
+    async def hit(self, key: str) -> bool:
+        return self.limiter.hit(key)
+
+    async def close(self):
+        pass
+
+class SQLiteRateLimit:
+    """Window counters in a SQLite file shared by every worker process on the host.
+
+    One short IMMEDIATE transaction per check: read the current and previous
+    window's rows and, if the request is allowed, upsert-increment the current
+    one (rejected requests are not counted, as in SlidingWindowLimiter). Rows
+    carry an expiry and are purged every few thousand checks.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH, limit: int = POST_LIMIT_COUNT,
+                 window: float = POST_LIMIT_WINDOW):
+        self.path = path
+        self.limit = limit
+        self.window = float(window)
+        self._local = threading.local()
+        self._calls = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def hit_sync(self, key: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        idx = int(now // self.window)
+        cur_key, prev_key = f"{key}:{idx}", f"{key}:{idx - 1}"
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            counts = dict(conn.execute("SELECT key, count FROM rate_limit WHERE key IN (?, ?)", (cur_key, prev_key)).fetchall())
+            over = _window_over_limit(counts.get(prev_key, 0), counts.get(cur_key, 0), now, idx, self.window, self.limit)
+            if not over:
+                conn.execute(
+                    "INSERT INTO rate_limit (key, count, expires) VALUES (?, 1, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET count = count + 1",
+                    (cur_key, (idx + 2) * self.window),
+                )
+            self._calls += 1
+            if self._calls % 5000 == 0:
+                conn.execute("DELETE FROM rate_limit WHERE expires < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return over
+
+    async def setup(self):
+        # a bad path or read-only directory fails here, not on the first /lead
+        await asyncio.to_thread(self._conn)
+
+    async def hit(self, key: str) -> bool:
+        return await asyncio.to_thread(self.hit_sync, key)
+
+    async def close(self):
+        pass
+
+class RedisRateLimit:
+    """Window counters in Redis (or anything speaking its protocol), shared by all hosts.
+
+    A small Lua script reads both window counters and only INCRs (+ EXPIREs) the
+    current one if the request is allowed: one atomic round trip per check, and
+    rejected requests are not counted, as in SlidingWindowLimiter.
+    """
+
+    SCRIPT = """
+    local cur = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+    if prev * tonumber(ARGV[1]) + cur >= tonumber(ARGV[2]) then
+        return 1
+    end
+    redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return 0
+    """
+
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL, limit: int = POST_LIMIT_COUNT,
+                 window: float = POST_LIMIT_WINDOW, prefix: str = "evohome:rl:"):
+        if aioredis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the 'redis' package")
+        self.limit = limit
+        self.window = float(window)
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url)
+        self._hit = self._redis.register_script(self.SCRIPT)
+
+    async def setup(self):
+        # load the script up front (EVALSHA then never needs the NOSCRIPT retry) and
+        # run it once with limit 0, which answers "over" without writing anything
+        await self._redis.script_load(self.SCRIPT)
+        probe = f"{self.prefix}setup-probe"
+        if int(await self._hit(keys=[probe, probe], args=["1", 0, 1])) != 1:
+            raise RuntimeError("rate limit script returned an unexpected result")
+
+    async def hit(self, key: str) -> bool:
+        now = time.time()
+        idx = int(now // self.window)
+        overlap = 1.0 - (now - idx * self.window) / self.window  # same weighting as _window_over_limit
+        over = await self._hit(
+            keys=[f"{self.prefix}{key}:{idx}", f"{self.prefix}{key}:{idx - 1}"],
+            args=[repr(overlap), self.limit, int(self.window * 2) + 1],
+        )
+        return bool(int(over))
+
+    async def close(self):
+        await self._redis.aclose()
+
+RATE_LIMITER = SlidingWindowLimiter()
+
+def _make_rate_limit_backend(name: str):
+    if name == "sqlite":
+        return SQLiteRateLimit()
+    if name == "redis":
+        return RedisRateLimit()
+    if name != "memory":
+        raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+    return MemoryRateLimit(RATE_LIMITER)
+
+RATE_LIMIT = _make_rate_limit_backend(RATE_LIMIT_BACKEND)
+RATE_LIMIT_STATS = {"checks": 0, "limited": 0, "backend_errors": 0, "last_error": None}
+log = logging.getLogger("app.main")
+
+async def rate_limited(ip: str) -> bool:
+    RATE_LIMIT_STATS["checks"] += 1
+    try:
+        limited = await RATE_LIMIT.hit(ip)
+    except Exception as e:
+        # shared store unreachable: fail open rather than drop leads, but say so
+        RATE_LIMIT_STATS["backend_errors"] += 1
+        RATE_LIMIT_STATS["last_error"] = f"{type(e).__name__}: {e}"[:300]
+        log.warning("rate limit backend %s failed, allowing request: %s", RATE_LIMIT_BACKEND, e)
+        return False
+    if limited:
+        RATE_LIMIT_STATS["limited"] += 1
+    return limited
+
+@app.on_event("startup")
+async def open_rate_limit():
+    # hit() fails open, so a backend that can't work at all (no Lua on the Redis
+    # server, unreachable store) would silently disable the limit; refuse to start
+    try:
+        await RATE_LIMIT.setup()
+    except Exception as e:
+        raise RuntimeError(f"RATE_LIMIT_BACKEND={RATE_LIMIT_BACKEND} is not usable: {type(e).__name__}: {e}") from e
+
+@app.on_event("shutdown")
+async def close_rate_limit():
+    await RATE_LIMIT.close()
+
+# -------------------------
+# Read cache (simple in-memory LRU)
+# -------------------------
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+
+class LRUCache:
+    """Bounded, thread-safe LRU map with hit/miss counters (per process).
+
+    Every write-side set() and invalidate() bumps a generation counter. A read
+    that fills the cache after a DB query passes the generation it saw before
+    the query; if a write happened meanwhile, the (possibly older) body is dropped.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
 
-def rate_limited(ip: str):
-    now = time.time()
-    bucket = RATE_BUCKET.setdefault(ip, [])
-    # drop old
-    while bucket and now - bucket[0] > POST_LIMIT_WINDOW:
-        bucket.pop(0)
-    if len(bucket) >= POST_LIMIT_COUNT:
-        return True
-    bucket.append(now)
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None):
+        with self._lock:
+            if generation is None:
+                self._generation += 1
+            elif generation != self._generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None):
+        with self._lock:
+            self._generation += 1
+            if prefix is not None:
+                for k in [k for k in self._data if k.startswith(prefix)]:
+                    del self._data[k]
+            elif key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+CONTENT_CACHE = LRUCache()
+COLLECTION_CACHE = LRUCache()  # full bodies and named views only: a bounded key set
+# ad-hoc ?fields= / ?category= / ?sort= / paged queries; kept apart so they can't evict the above
+QUERY_CACHE = LRUCache(int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "128")))
+ITEM_CACHE = LRUCache()  # keys: "<table>:<slug>"
+BOOTSTRAP_CACHE = LRUCache(64)  # keys: comma-joined sorted content keys
+
+# how often each process compares cache_revisions with what it has cached
+CACHE_REVISION_CHECK_SEC = float(os.getenv("CACHE_REVISION_CHECK_SEC", "1"))
+_SEEN_REVISIONS: Dict[str, int] = {}
+_REVISIONS_CHECKED_AT = 0.0
+_WARMING: set = set()  # refs to background rebuild tasks, so they aren't collected mid-run
+
+def _drop_cached_scope(scope: str):
+    if scope == "content":
+        CONTENT_CACHE.invalidate()
+        BOOTSTRAP_CACHE.invalidate()
+    elif scope == "pages":
+        PAGE_CACHE.invalidate()
+        PAGE_HTML_CACHE.invalidate()
+    else:
+        COLLECTION_CACHE.invalidate(prefix=scope)
+        QUERY_CACHE.invalidate(prefix=scope)
+        ITEM_CACHE.invalidate(prefix=f"{scope}:")
+
+def _note_revision(scope: str, rev: int):
+    # our own write: already reflected in this process's caches, unless another
+    # process wrote in between (then the next check drops the scope); a scope
+    # with no row yet is at revision 0
+    if _SEEN_REVISIONS.get(scope, 0) == rev - 1:
+        _SEEN_REVISIONS[scope] = rev
+
+async def sync_cache_revisions():
+    """Drop cached scopes written by other processes; one small query per interval."""
+    global _REVISIONS_CHECKED_AT
+    now = time.monotonic()
+    if now - _REVISIONS_CHECKED_AT < CACHE_REVISION_CHECK_SEC:
+        return
+    _REVISIONS_CHECKED_AT = now
+    db = SessionLocal()
+    try:
+        rows = (await db.execute(select(CacheRevision.scope, CacheRevision.rev))).all()
+    finally:
+        await db.close()
+    for scope, rev in rows:
+        seen = _SEEN_REVISIONS.get(scope)
+        if seen != rev:
+            _SEEN_REVISIONS[scope] = rev
+            _drop_cached_scope(scope)
+            model = {m.__tablename__: m for m in (ServiceItem, BlogPost, GalleryItem)}.get(scope)
+            if model is not None and seen is not None:
+                # another process wrote this collection: rebuild its bodies off the request path
+                task = asyncio.create_task(_warm_views(model))
+                _WARMING.add(task)
+                task.add_done_callback(_WARMING.discard)
+
+# -------------------------
+# Pre-encoded JSON bodies
+# -------------------------
+def _encode_json(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; stdlib handles them
+    # same output as starlette's JSONResponse
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+class EncodedBody:
+    """A JSON payload encoded once, with gzip/brotli variants and a strong ETag.
+
+    Variants are built here, i.e. once per write, and skipped for bodies under
+    COMPRESS_MIN_BYTES where compression costs more than it saves. Pass bytes
+    and a media_type for non-JSON bodies (pre-rendered HTML).
+    """
+    __slots__ = ("raw", "gzip", "br", "etag", "media_type")
+
+    def __init__(self, obj: Any, media_type: str = "application/json"):
+        self.raw = obj if isinstance(obj, bytes) else _encode_json(obj)
+        self.media_type = media_type
+        self.etag = hashlib.sha256(self.raw).hexdigest()[:32]
+        small = len(self.raw) < COMPRESS_MIN_BYTES
+        self.gzip = None if small else gzip.compress(self.raw, compresslevel=6)
+        self.br = brotli.compress(self.raw, quality=5) if brotli and not small else None
+
+def _parse_accept_encoding(header: Optional[str]) -> set:
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if not name or params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.lower())
+    return accepted
+
+def _accepted_encodings(request: Request) -> set:
+    return _parse_accept_encoding(request.headers.get("accept-encoding"))
+
+class JSONCompressionMiddleware:
+    """br/gzip for JSON responses that are not already encoded (e.g. not from the caches).
+
+    Cached endpoints send EncodedBody variants with Content-Encoding set and pass
+    through untouched; everything else is compressed per response above the threshold.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = _parse_accept_encoding(Headers(scope=scope).get("accept-encoding"))
+        encoding = "br" if brotli and "br" in accepted else "gzip" if "gzip" in accepted else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        start = None
+        chunks: List[bytes] = []
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if headers.get("content-type", "").startswith("application/json") and "content-encoding" not in headers:
+                    start = message  # hold until the whole body is in
+                    return
+                await send(message)
+            elif message["type"] == "http.response.body" and start is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = b"".join(chunks)
+                if len(body) >= self.minimum_size:
+                    body = brotli.compress(body, quality=4) if encoding == "br" else gzip.compress(body, compresslevel=6)
+                    headers = MutableHeaders(scope=start)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+app.add_middleware(JSONCompressionMiddleware)
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match uses weak comparison; any encoding variant of the same body matches
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag.split("-", 1)[0] == etag:
+            return True
     return False
 
+def encoded_response(request: Request, body: EncodedBody, status_code: int = 200) -> Response:
+    accepted = _accepted_encodings(request)
+    headers = {"Vary": "Accept-Encoding"}
+    if body.br is not None and "br" in accepted:
+        content = body.br
+        headers["Content-Encoding"] = "br"
+        headers["ETag"] = f'"{body.etag}-br"'
+    elif body.gzip is not None and "gzip" in accepted:
+        content = body.gzip
+        headers["Content-Encoding"] = "gzip"
+        headers["ETag"] = f'"{body.etag}-gzip"'
+    else:
+        content = body.raw
+        headers["ETag"] = f'"{body.etag}"'
+    if status_code == 200 and _etag_matches(request, body.etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, status_code=status_code, media_type=body.media_type, headers=headers)
+
 # -------------------------
 # Auth
 # -------------------------
@@ -195,15 +956,21 @@ def health():
 # Content (singletons)
 # -------------------------
 @app.get("/content/{key}")
-def get_content(key: str):
-    db = SessionLocal()
-    try:
-        obj = db.query(Content).filter(Content.key == key).first()
-        if not obj:
-            raise HTTPException(404, "Not found")
-        return obj.data
-    finally:
-        db.close()
+async def get_content(key: str, request: Request):
+    await sync_cache_revisions()
+    body = CONTENT_CACHE.get(key)
+    if body is None:
+        gen = CONTENT_CACHE.generation()
+        db = SessionLocal()
+        try:
+            data = await db.scalar(select(Content.data).where(Content.key == key))
+            if data is None:
+                raise HTTPException(404, "Not found")
+            body = EncodedBody(data)
+        finally:
+            await db.close()
+        CONTENT_CACHE.set(key, body, gen)
+    return encoded_response(request, body)
 
 @app.post("/content/{key}")
 async def save_content(key: str, request: Request):
@@ -220,43 +987,152 @@ async def save_content(key: str, request: Request):
 
     db = SessionLocal()
     try:
-        obj = db.query(Content).filter(Content.key == key).first()
-        if obj:
-            obj.data = body
-        else:
-            db.add(Content(key=key, data=body))
-        db.commit()
-        return {"ok": True, "key": key}
+        await _upsert_content(db, key, body)
+        encoded = EncodedBody(body)
+        CONTENT_CACHE.set(key, encoded)
+        BOOTSTRAP_CACHE.invalidate()
+        return {"ok": True, "key": key, "etag": encoded.etag}
     finally:
-        db.close()
+        await db.close()
+
+@app.get("/bootstrap")
+async def bootstrap(request: Request, keys: Optional[str] = None):
+    """All requested singletons in one document: {key: data | null}."""
+    wanted = sorted({k.strip() for k in (keys.split(",") if keys else BOOTSTRAP_KEYS) if k.strip()})
+    if not wanted:
+        raise HTTPException(400, "No keys requested")
+    if len(wanted) > 50:
+        raise HTTPException(400, "Too many keys (max 50)")
+    cache_key = ",".join(wanted)
+    await sync_cache_revisions()
+    body = BOOTSTRAP_CACHE.get(cache_key)
+    if body is None:
+        gen = BOOTSTRAP_CACHE.generation()
+        db = SessionLocal()
+        try:
+            rows = (await db.execute(select(Content.key, Content.data).where(Content.key.in_(wanted)))).all()
+        finally:
+            await db.close()
+        found = {r.key: r.data for r in rows}
+        body = EncodedBody({k: found.get(k) for k in wanted})
+        BOOTSTRAP_CACHE.set(cache_key, body, gen)
+    return encoded_response(request, body)
 
 # -------------------------
 # Collections helpers
 # -------------------------
-def _replace_collection(db, model, items: List[dict], unique: str):
-    # wipe + insert clean
-    db.query(model).delete()
+def _row_fields(model, o: dict, unique: str) -> dict:
+    fields = {}
+    if unique == "slug":
+        fields["slug"] = o.get("slug") or o.get("id") or f"{int(time.time()*1000)}"
+    if model is GalleryItem:
+        fields["title"] = o.get("title") or ""
+        fields["category"] = o.get("category") or ""
+        fields["data"] = o
+    elif model is BlogPost:
+        fields["title"] = o.get("title") or ""
+        fields["data"] = o
+    elif model is ServiceItem:
+        fields["name"] = o.get("name") or ""
+        fields["category"] = o.get("category") or ""
+        fields["data"] = o
+    return fields
+
+async def _replace_collection(db, model, items: List[dict], unique: str) -> dict:
+    # wipe + bulk insert clean: one DELETE and one executemany INSERT
+    # (asyncpg runs it as one prepared statement pipelined over all rows; aiosqlite as
+    # sqlite3 executemany, one statement compiled once)
+    started = time.perf_counter()
+    rows = [_row_fields(model, o, unique) for o in items if isinstance(o, dict)]
+    await db.execute(delete(model))
+    if rows:
+        await db.execute(insert(model), rows)
+    searchable = [(r.get("slug"), r["data"]) for r in rows]
+    await _search_write(db, model, searchable, replace=True)
+    rev = await _bump_revision(db, model.__tablename__)
+    await db.commit()
+    _note_revision(model.__tablename__, rev)
+    COLLECTION_CACHE.invalidate(prefix=model.__tablename__)
+    QUERY_CACHE.invalidate(prefix=model.__tablename__)
+    ITEM_CACHE.invalidate(prefix=f"{model.__tablename__}:")
+    await _warm_views(model)
+    await _search_update(model, searchable, replace=True)
+    return {"inserted": len(rows), "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+async def _sync_collection(db, model, items: List[dict], unique: str) -> dict:
+    # diff against existing rows by unique key; only touch what changed.
+    # Lists are served in id order, so if the payload reorders rows, everything from
+    # the first out-of-place item on is re-inserted ("moved"); the prefix is untouched.
+    started = time.perf_counter()
+    table = model.__tablename__
+    incoming: Dict[str, dict] = {}
+    duplicates: List[str] = []
     for o in items:
-        if not isinstance(o, dict):
-            continue
-        fields = {}
-        if unique == "slug":
-            fields["slug"] = o.get("slug") or o.get("id") or f"{int(time.time()*1000)}"
-        if model is GalleryItem:
-            fields["title"] = o.get("title") or ""
-            fields["category"] = o.get("category") or ""
-            fields["data"] = o
-        elif model is BlogPost:
-            fields["title"] = o.get("title") or ""
-            fields["data"] = o
-        elif model is ServiceItem:
-            fields["name"] = o.get("name") or ""
-            fields["category"] = o.get("category") or ""
-            fields["data"] = o
-        db.add(model(**fields))
-    db.commit()
-
-def _upsert_one(db, model, unique_field: str, payload: dict):
+        if isinstance(o, dict):
+            fields = _row_fields(model, o, unique)
+            if fields[unique] in incoming:
+                duplicates.append(fields[unique])
+            incoming[fields[unique]] = fields
+    if duplicates:
+        raise HTTPException(400, f"mode=diff needs a unique {unique} per item; duplicated: "
+                                 f"{', '.join(sorted(set(map(str, duplicates))))}")
+    cols = [c for c in model.__table__.columns.keys() if c != "id"]
+    existing: Dict[str, Any] = {}
+    stale_ids: List[int] = []
+    stale_keys: List[str] = []
+    result = await db.execute(select(model.id, *[getattr(model, c) for c in cols]).order_by(model.id))
+    for r in result:
+        key = getattr(r, unique)
+        if key in existing or key not in incoming:
+            stale_ids.append(r.id)
+            stale_keys.append(key)
+        else:
+            existing[key] = r
+    added = [f for k, f in incoming.items() if k not in existing]
+    changed = [dict(f, id=existing[k].id) for k, f in incoming.items()
+               if k in existing and any(getattr(existing[k], c) != f.get(c) for c in cols)]
+    changed_keys = [f[unique] for f in changed]
+    removed = len(stale_ids)
+    inserts = added
+    moved: List[str] = []
+    order, want = list(existing) + [f[unique] for f in added], list(incoming)
+    first = next((i for i, (a, b) in enumerate(zip(order, want)) if a != b), None)
+    if first is not None:
+        # every added key falls in the tail too, so the tail is inserted in payload order
+        moved = [k for k in want[first:] if k in existing]
+        stale_ids += [existing[k].id for k in moved]
+        changed = [f for f in changed if f[unique] not in moved]
+        inserts = [incoming[k] for k in want[first:]]
+    if stale_ids:
+        await db.execute(delete(model).where(model.id.in_(stale_ids)))
+    if changed:
+        await db.execute(update(model), changed)
+    if inserts:
+        await db.execute(insert(model), inserts)
+    searchable = [(f[unique], f["data"]) for f in changed + inserts]
+    dropped = [k for k in stale_keys if k not in incoming]
+    if searchable or dropped:
+        await _search_write(db, model, searchable, dropped)
+    rev = await _bump_revision(db, table) if stale_ids or changed or inserts else None
+    await db.commit()
+    if rev is not None:
+        _note_revision(table, rev)
+        COLLECTION_CACHE.invalidate(prefix=table)
+        QUERY_CACHE.invalidate(prefix=table)
+        for key in stale_keys + changed_keys:
+            ITEM_CACHE.invalidate(f"{table}:{key}")
+        await _warm_views(model)
+        await _search_update(model, searchable, dropped)
+    return {
+        "added": len(added),
+        "changed": len(changed_keys),
+        "moved": len(moved),
+        "removed": removed,
+        "unchanged": len(existing) - len(set(changed_keys) | set(moved)),
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+async def _upsert_one(db, model, unique_field: str, payload: dict):
     if model is ServiceItem:
         keyval = payload.get("slug")
     elif model is BlogPost:
@@ -265,167 +1141,1258 @@ def _upsert_one(db, model, unique_field: str, payload: dict):
         keyval = payload.get("title")
     if not keyval:
         raise HTTPException(400, f"Missing unique field for {model.__tablename__}")
-    obj = db.query(model).filter(getattr(model, unique_field)==keyval).first()
-    if obj:
-        # update
-        if model is ServiceItem:
-            obj.name = payload.get("name", obj.name)
-            obj.category = payload.get("category", obj.category)
-            obj.data = payload
-        elif model is BlogPost:
-            obj.title = payload.get("title", obj.title)
-            obj.data = payload
-        else:
-            obj.title = payload.get("title", obj.title)
-            obj.category = payload.get("category", obj.category)
-            obj.data = payload
+    if model is ServiceItem:
+        values = {"slug": keyval, "name": payload.get("name") or "", "category": payload.get("category","")}
+    elif model is BlogPost:
+        values = {"slug": keyval, "title": payload.get("title") or ""}
+    else:
+        values = {"title": payload.get("title") or "", "category": payload.get("category","")}
+    values["data"] = payload
+    # on update, columns missing from the payload keep their stored value
+    updates = {k: v for k, v in values.items() if k == "data" or (k != unique_field and k in payload)}
+
+    ins = _native_insert()
+    if ins is not None and getattr(model, unique_field).unique:
+        # single statement, no read-modify-write race on the unique index
+        stmt = ins(model).values(**values)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[unique_field],
+            set_={k: getattr(stmt.excluded, k) for k in updates},
+        ))
     else:
-        if model is ServiceItem:
-            obj = ServiceItem(slug=keyval, name=payload.get("name",""), category=payload.get("category",""), data=payload)
-        elif model is BlogPost:
-            obj = BlogPost(slug=keyval, title=payload.get("title",""), data=payload)
+        obj = await db.scalar(select(model).where(getattr(model, unique_field)==keyval))
+        if obj:
+            for k, v in updates.items():
+                setattr(obj, k, v)
         else:
-            obj = GalleryItem(title=payload.get("title",""), category=payload.get("category",""), data=payload)
-        db.add(obj)
-    db.commit()
+            db.add(model(**values))
+    await _search_write(db, model, [(keyval, payload)])
+    rev = await _bump_revision(db, model.__tablename__)
+    await db.commit()
+    _note_revision(model.__tablename__, rev)
+    COLLECTION_CACHE.invalidate(prefix=model.__tablename__)
+    QUERY_CACHE.invalidate(prefix=model.__tablename__)
+    ITEM_CACHE.invalidate(f"{model.__tablename__}:{keyval}")
+    await _warm_views(model)
+    await _search_update(model, [(keyval, payload)])
 
-# -------------------------
-# Services
-# -------------------------
-@app.get("/services")
-def list_services():
+async def _collection_body(model) -> EncodedBody:
+    key = model.__tablename__
+    await sync_cache_revisions()
+    body = COLLECTION_CACHE.get(key)
+    if body is not None:
+        return body
+    gen = COLLECTION_CACHE.generation()
     db = SessionLocal()
     try:
-        rows = db.query(ServiceItem).all()
-        return [r.data for r in rows]
+        rows = (await db.scalars(select(model.data).order_by(model.id))).all()
+        body = EncodedBody(list(rows))
     finally:
-        db.close()
+        await db.close()
+    COLLECTION_CACHE.set(key, body, gen)
+    return body
 
-@app.get("/services/{slug}")
-def get_service(slug: str):
+# ?sort= columns per collection ("-" prefix for descending); "id" is insertion order
+COLLECTION_SORTS = {"services": ("id", "name"), "blogs": ("id", "title"), "gallery": ("id", "title")}
+
+# named ?view= projections for listing pages; built on every write, with the full list (see _warm_views)
+COLLECTION_VIEWS = {
+    "services": {"card": ["name", "slug", "image", "description", "category"]},
+    "blogs": {"card": ["title", "slug", "excerpt", "date", "author", "image", "category"]},
+}
+
+def _resolve_fields(table: str, fields: Optional[str], view: Optional[str]) -> Optional[tuple]:
+    # ?fields=a,b or ?view=<name> -> tuple of top-level keys to keep (None = whole item)
+    if view is not None:
+        if fields is not None:
+            raise HTTPException(400, "Use either fields or view, not both")
+        views = COLLECTION_VIEWS.get(table, {})
+        if view not in views:
+            raise HTTPException(400, f"view must be one of: {', '.join(views) or '(none for this collection)'}")
+        return tuple(views[view])
+    if fields is None:
+        return None
+    wanted = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    if not wanted:
+        raise HTTPException(400, "fields must name at least one field")
+    return wanted
+
+def _project(data: Any, fields: Optional[tuple]) -> Any:
+    if fields is None or not isinstance(data, dict):
+        return data
+    return {k: data[k] for k in fields if k in data}
+
+def _encode_cursor(value: Any, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, column: str) -> tuple:
+    # [sort value, id]: an int for ?sort=id, a string for name/title
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+    value_type = int if column == "id" else str
+    if type(row_id) is not int or type(value) is not value_type:
+        raise HTTPException(400, "Invalid cursor")
+    return value, row_id
+
+async def _collection_page(model, category: Optional[str], sort: str, limit: Optional[int],
+                           cursor: Optional[str], fields: Optional[tuple] = None) -> EncodedBody:
+    """Filtered/sorted/projected list, or one keyset page of it when limit or cursor is given.
+
+    Pages are {"items": [...], "next_cursor": str|null}; the cursor holds the last
+    row's (sort value, id), and each page is a (sort column, id) row-value range
+    over the ix_*_id indexes, not an OFFSET.
+    """
+    table = model.__tablename__
+    column = sort.lstrip("-")
+    if column not in COLLECTION_SORTS[table]:
+        raise HTTPException(400, f"sort must be one of: {', '.join(COLLECTION_SORTS[table])} (prefix - for descending)")
+    paged = limit is not None or cursor is not None
+    limit = COLLECTION_MAX_LIMIT if limit is None else limit
+    if not 1 <= limit <= COLLECTION_MAX_LIMIT:
+        raise HTTPException(400, f"limit must be between 1 and {COLLECTION_MAX_LIMIT}")
+    key = (f"{table}?category={category or ''}&sort={sort}&limit={limit if paged else ''}&cursor={cursor or ''}"
+           f"&fields={','.join(fields or ())}")
+    views = [tuple(v) for v in COLLECTION_VIEWS.get(table, {}).values()]
+    named = not paged and category is None and sort == "id" and fields in views
+    cache = COLLECTION_CACHE if named else QUERY_CACHE
+    await sync_cache_revisions()
+    body = cache.get(key)
+    if body is not None:
+        return body
+    gen = cache.generation()
+
+    descending = sort.startswith("-")
+    sort_col = getattr(model, column)
+    q = select(model.id, sort_col.label("sort_value"), model.data)
+    if category:
+        q = q.where(model.category == category)
+    if cursor is not None:
+        value, last_id = _decode_cursor(cursor, column)
+        after = (lambda a, b: a < b) if descending else (lambda a, b: a > b)
+        q = q.where(after(model.id, last_id) if column == "id"
+                    else after(tuple_(sort_col, model.id), tuple_(value, last_id)))
+    if descending:
+        q = q.order_by(sort_col.desc(), model.id.desc())
+    else:
+        q = q.order_by(sort_col, model.id)
+    if paged:
+        q = q.limit(limit + 1)
+    db = SessionLocal()
+    try:
+        rows = (await db.execute(q)).all()
+    finally:
+        await db.close()
+    if paged:
+        more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].sort_value, rows[-1].id) if more else None
+        body = EncodedBody({"items": [_project(r.data, fields) for r in rows], "next_cursor": next_cursor})
+    else:
+        body = EncodedBody([_project(r.data, fields) for r in rows])
+    cache.set(key, body, gen)
+    return body
+
+async def _warm_views(model):
+    # rebuild the full list and the named projections right after a write, ETag and
+    # gzip/br variants included, so neither the next GET nor its 304 check pays for them
+    await _collection_body(model)
+    for fields in COLLECTION_VIEWS.get(model.__tablename__, {}).values():
+        await _collection_page(model, None, "id", None, None, tuple(fields))
+
+async def _list_collection(request: Request, model, category: Optional[str] = None, sort: str = "id",
+                           limit: Optional[int] = None, cursor: Optional[str] = None,
+                           fields: Optional[str] = None, view: Optional[str] = None) -> Response:
+    projection = _resolve_fields(model.__tablename__, fields, view)
+    if category is None and sort == "id" and limit is None and cursor is None and projection is None:
+        return encoded_response(request, await _collection_body(model))
+    return encoded_response(request, await _collection_page(model, category, sort, limit, cursor, projection))
+
+async def _item_body(model, slug: str) -> EncodedBody:
+    key = f"{model.__tablename__}:{slug}"
+    await sync_cache_revisions()
+    body = ITEM_CACHE.get(key)
+    if body is not None:
+        return body
+    gen = ITEM_CACHE.generation()
     db = SessionLocal()
     try:
-        r = db.query(ServiceItem).filter(ServiceItem.slug==slug).first()
+        r = (await db.execute(select(model.data).where(model.slug == slug))).first()
         if not r: raise HTTPException(404, "Not found")
-        return r.data
+        body = EncodedBody(r.data)
     finally:
-        db.close()
+        await db.close()
+    ITEM_CACHE.set(key, body, gen)
+    return body
+
+# -------------------------
+# Services
+# -------------------------
+@app.get("/services")
+async def list_services(request: Request, category: Optional[str] = None, sort: str = "id",
+                        limit: Optional[int] = None, cursor: Optional[str] = None,
+                        fields: Optional[str] = None, view: Optional[str] = None):
+    return await _list_collection(request, ServiceItem, category, sort, limit, cursor, fields, view)
+
+@app.get("/services/{slug}")
+async def get_service(slug: str, request: Request):
+    return encoded_response(request, await _item_body(ServiceItem, slug))
 
 @app.post("/services")
-async def save_services(request: Request):
+async def save_services(request: Request, mode: Literal["replace", "diff"] = "replace"):
     require_admin(request)
     body = await request.json()
     db = SessionLocal()
     try:
+        if isinstance(body, list) and mode == "diff":
+            return {"ok": True, **await _sync_collection(db, ServiceItem, body, "slug")}
         if isinstance(body, list):
-            _replace_collection(db, ServiceItem, body, "slug")
-            return {"ok": True, "replaced": len(body)}
+            stats = await _replace_collection(db, ServiceItem, body, "slug")
+            return {"ok": True, "replaced": len(body), "ms": stats["ms"]}
         elif isinstance(body, dict):
-            _upsert_one(db, ServiceItem, "slug", body)
+            await _upsert_one(db, ServiceItem, "slug", body)
             return {"ok": True, "upserted": body.get("slug")}
         else:
             raise HTTPException(400, "Send a list (replace all) or an object (upsert one).")
     finally:
-        db.close()
+        await db.close()
 
 # -------------------------
 # Blogs
 # -------------------------
 @app.get("/blogs")
-def list_blogs():
-    db = SessionLocal()
-    try:
-        rows = db.query(BlogPost).all()
-        return [r.data for r in rows]
-    finally:
-        db.close()
+async def list_blogs(request: Request, sort: str = "id", limit: Optional[int] = None, cursor: Optional[str] = None,
+                     fields: Optional[str] = None, view: Optional[str] = None):
+    # blogs keep their category inside data only, so there is no category filter here
+    return await _list_collection(request, BlogPost, None, sort, limit, cursor, fields, view)
 
 @app.get("/blogs/{slug}")
-def get_blog(slug: str):
-    db = SessionLocal()
-    try:
-        r = db.query(BlogPost).filter(BlogPost.slug==slug).first()
-        if not r: raise HTTPException(404, "Not found")
-        return r.data
-    finally:
-        db.close()
+async def get_blog(slug: str, request: Request):
+    return encoded_response(request, await _item_body(BlogPost, slug))
 
 @app.post("/blogs")
-async def save_blogs(request: Request):
+async def save_blogs(request: Request, mode: Literal["replace", "diff"] = "replace"):
     require_admin(request)
     body = await request.json()
     db = SessionLocal()
     try:
+        if isinstance(body, list) and mode == "diff":
+            return {"ok": True, **await _sync_collection(db, BlogPost, body, "slug")}
         if isinstance(body, list):
-            _replace_collection(db, BlogPost, body, "slug")
-            return {"ok": True, "replaced": len(body)}
+            stats = await _replace_collection(db, BlogPost, body, "slug")
+            return {"ok": True, "replaced": len(body), "ms": stats["ms"]}
         elif isinstance(body, dict):
-            _upsert_one(db, BlogPost, "slug", body)
+            await _upsert_one(db, BlogPost, "slug", body)
             return {"ok": True, "upserted": body.get("slug")}
         else:
             raise HTTPException(400, "Send a list (replace all) or an object (upsert one).")
     finally:
-        db.close()
+        await db.close()
 
 # -------------------------
 # Gallery
 # -------------------------
 @app.get("/gallery")
-def list_gallery():
-    db = SessionLocal()
-    try:
-        rows = db.query(GalleryItem).all()
-        return [r.data for r in rows]
-    finally:
-        db.close()
+async def list_gallery(request: Request, category: Optional[str] = None, sort: str = "id",
+                       limit: Optional[int] = None, cursor: Optional[str] = None,
+                       fields: Optional[str] = None, view: Optional[str] = None):
+    return await _list_collection(request, GalleryItem, category, sort, limit, cursor, fields, view)
 
 @app.post("/gallery")
-async def save_gallery(request: Request):
+async def save_gallery(request: Request, mode: Literal["replace", "diff"] = "replace"):
     require_admin(request)
     body = await request.json()
     db = SessionLocal()
     try:
+        if isinstance(body, list) and mode == "diff":
+            return {"ok": True, **await _sync_collection(db, GalleryItem, body, "title")}
         if isinstance(body, list):
-            _replace_collection(db, GalleryItem, body, "title")
-            return {"ok": True, "replaced": len(body)}
+            stats = await _replace_collection(db, GalleryItem, body, "title")
+            return {"ok": True, "replaced": len(body), "ms": stats["ms"]}
         elif isinstance(body, dict):
-            _upsert_one(db, GalleryItem, "title", body)
+            await _upsert_one(db, GalleryItem, "title", body)
             return {"ok": True, "upserted": body.get("title")}
         else:
             raise HTTPException(400, "Send a list (replace all) or an object (upsert one).")
     finally:
-        db.close()
+        await db.close()
+
+# -------------------------
+# Pages (block layouts)
+# -------------------------
+PAGE_CACHE = LRUCache()
+PAGE_HTML_CACHE = LRUCache()
+
+def _html_body(html: str) -> EncodedBody:
+    return EncodedBody(html.encode("utf-8"), "text/html; charset=utf-8")
+
+def _validate_page(data: Any) -> dict:
+    """Validate a page document once, at write time; returns the normalised dict."""
+    try:
+        page = PageSchema.model_validate(data)
+    except ValidationError as e:
+        raise ValueError(f"Invalid page: {e.errors()[0]['loc']}: {e.errors()[0]['msg']}")
+    for i, block in enumerate(page.blocks):
+        for prop in PAGE_BLOCK_LIST_PROPS.get(block.type, []):
+            if prop in block.props and not isinstance(block.props[prop], list):
+                raise ValueError(f"Invalid page: blocks[{i}] ({block.type}): props.{prop} must be a list")
+    return page.model_dump()
+
+async def _save_page(db, slug: str, data: Any) -> EncodedBody:
+    doc = _validate_page(data)
+    html = render_blocks(doc["blocks"])
+    await _upsert_keyed(db, Page, "slug", slug, data=doc, html=html)
+    body = EncodedBody(doc)
+    PAGE_CACHE.set(slug, body)
+    PAGE_HTML_CACHE.set(slug, _html_body(html))
+    return body
+
+# declared before /pages/{slug}, which would otherwise match "<slug>.html"
+@app.get("/pages/{slug}.html")
+async def get_page_html(slug: str, request: Request):
+    await sync_cache_revisions()
+    body = PAGE_HTML_CACHE.get(slug)
+    if body is None:
+        gen = PAGE_HTML_CACHE.generation()
+        db = SessionLocal()
+        try:
+            row = (await db.execute(select(Page.data, Page.html).where(Page.slug == slug))).first()
+            if row is None:
+                raise HTTPException(404, "Not found")
+            # rows saved before pre-rendering existed have no html yet
+            body = _html_body(row.html if row.html is not None else render_blocks(row.data.get("blocks", [])))
+        finally:
+            await db.close()
+        PAGE_HTML_CACHE.set(slug, body, gen)
+    return encoded_response(request, body)
+
+@app.get("/pages/{slug}")
+async def get_page(slug: str, request: Request):
+    await sync_cache_revisions()
+    body = PAGE_CACHE.get(slug)
+    if body is None:
+        gen = PAGE_CACHE.generation()
+        db = SessionLocal()
+        try:
+            data = await db.scalar(select(Page.data).where(Page.slug == slug))
+            if data is None:
+                raise HTTPException(404, "Not found")
+            body = EncodedBody(data)
+        finally:
+            await db.close()
+        PAGE_CACHE.set(slug, body, gen)
+    return encoded_response(request, body)
+
+@app.post("/pages/{slug}")
+async def save_page(slug: str, request: Request):
+    require_admin(request)
+    body = await request.json()
+    db = SessionLocal()
+    try:
+        try:
+            encoded = await _save_page(db, slug, body)
+        except ValueError as e:
+            raise HTTPException(422, str(e))
+        return {"ok": True, "slug": slug, "etag": encoded.etag}
+    finally:
+        await db.close()
+
+# -------------------------
+# Search (services + blogs)
+# -------------------------
+# auto: SQLite FTS5 / Postgres tsvector, else the in-process index | memory
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").lower()
+SEARCH_MAX_LIMIT = 50
+
+# table -> (result type, title field, body fields); strings are collected recursively
+SEARCH_FIELDS = {
+    "services": ("service", "name", ["description", "longDescription", "whatIsIt", "benefits",
+                                     "howItWorksSteps", "whyChooseContent", "howEvoHomeHelpsContent", "category"]),
+    "blogs": ("blog", "title", ["excerpt", "content", "author", "category"]),
+}
+SEARCH_TITLE_WEIGHT = 5.0
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+")
+# snippet highlight markers, swapped for <mark> after escaping
+_HL_START, _HL_END = "\x02", "\x03"
+
+def _flatten_text(v: Any) -> List[str]:
+    if isinstance(v, str):
+        return [v]
+    if isinstance(v, list):
+        return [s for x in v for s in _flatten_text(x)]
+    if isinstance(v, dict):
+        return [s for x in v.values() for s in _flatten_text(x)]
+    return []
+
+def _plain(s: str) -> str:
+    return " ".join(html_unescape(_TAG_RE.sub(" ", s)).split())
+
+def _search_doc(table: str, data: Any) -> tuple:
+    # (title, body) as plain text
+    _, title_field, body_fields = SEARCH_FIELDS[table]
+    data = data if isinstance(data, dict) else {}
+    title = _plain(str(data.get(title_field) or ""))
+    body = _plain(" ".join(s for f in body_fields for s in _flatten_text(data.get(f))))
+    return title, body
+
+def _query_terms(q: str) -> List[str]:
+    return _WORD_RE.findall(q.lower())[:10]
+
+def _highlight(snippet: str) -> str:
+    return html_escape(snippet, quote=False).replace(_HL_START, "<mark>").replace(_HL_END, "</mark>")
+
+class MemorySearch:
+    """Pure-Python inverted index with BM25 ranking (fallback backend).
+
+    Lives in this process only: rebuilt from the DB at startup and kept current
+    by this process's writes, so use FTS5/Postgres when running several workers.
+    The title counts SEARCH_TITLE_WEIGHT times towards term frequency and length.
+    """
+    name = "memory"
+    in_db = False
+    k1, b = 1.2, 0.75
+
+    def __init__(self):
+        self._docs: Dict[tuple, tuple] = {}  # (table, slug) -> (title, body, length)
+        self._postings: Dict[str, Dict[tuple, float]] = {}
+        self._terms: Optional[List[str]] = None  # sorted, for prefix lookups
+        self._total_len = 0.0
+
+    async def setup(self):
+        pass
+
+    def _remove(self, key: tuple):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        title, body, length = doc
+        self._total_len -= length
+        for term in set(_WORD_RE.findall(f"{title} {body}".lower())):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self._postings[term]
+                    self._terms = None
+
+    def _add(self, key: tuple, title: str, body: str):
+        self._remove(key)
+        tf: Dict[str, float] = {}
+        for term in _WORD_RE.findall(title.lower()):
+            tf[term] = tf.get(term, 0.0) + SEARCH_TITLE_WEIGHT
+        for term in _WORD_RE.findall(body.lower()):
+            tf[term] = tf.get(term, 0.0) + 1.0
+        length = sum(tf.values())
+        for term, n in tf.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._terms = None
+            self._postings[term][key] = n
+        self._docs[key] = (title, body, length)
+        self._total_len += length
+
+    async def replace(self, table: str, docs: List[tuple]):
+        for key in [k for k in self._docs if k[0] == table]:
+            self._remove(key)
+        await self.upsert(table, docs)
+
+    async def upsert(self, table: str, docs: List[tuple]):
+        for slug, title, body in docs:
+            self._add((table, slug), title, body)
+
+    async def delete(self, table: str, slugs: List[str]):
+        for slug in slugs:
+            self._remove((table, slug))
+
+    async def count(self) -> int:
+        return len(self._docs)
+
+    def _expand(self, term: str) -> List[str]:
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        i = bisect.bisect_left(self._terms, term)
+        out = []
+        while i < len(self._terms) and self._terms[i].startswith(term):
+            out.append(self._terms[i])
+            i += 1
+        return out
+
+    def _snippet(self, text: str, words: set, prefix: str, need_match: bool, width: int = 24) -> str:
+        tokens = list(_WORD_RE.finditer(text))
+        matches = lambda t: t in words or t.startswith(prefix)
+        first = next((i for i, m in enumerate(tokens) if matches(m.group().lower())), None)
+        if first is None and need_match or not tokens:
+            return ""
+        first = first or 0
+        lo = max(0, first - width // 3)
+        hi = min(len(tokens), lo + width)
+        out, pos = [], tokens[lo].start()
+        for m in tokens[lo:hi]:
+            out.append(text[pos:m.start()])
+            out.append(f"{_HL_START}{m.group()}{_HL_END}" if matches(m.group().lower()) else m.group())
+            pos = m.end()
+        return ("…" if lo > 0 else "") + "".join(out) + ("…" if hi < len(tokens) else "")
+
+    async def query(self, q: str, table: Optional[str], limit: int) -> List[dict]:
+        terms = _query_terms(q)
+        if not terms or not self._docs:
+            return []
+        # every term must match; the last one also matches as a prefix (type-ahead)
+        groups = [[t] if t in self._postings else [] for t in terms[:-1]] + [self._expand(terms[-1])]
+        if any(not g for g in groups):
+            return []
+        n = len(self._docs)
+        avg_len = self._total_len / n
+        candidates = None
+        for group in groups:
+            keys = set().union(*(self._postings[t].keys() for t in group))
+            candidates = keys if candidates is None else candidates & keys
+        scores: Dict[tuple, float] = {}
+        for key in candidates:
+            if table and key[0] != table:
+                continue
+            length = self._docs[key][2]
+            score = 0.0
+            for group in groups:
+                for t in group:
+                    tf = self._postings[t].get(key)
+                    if tf:
+                        df = len(self._postings[t])
+                        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                        score += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_len))
+            scores[key] = score
+        words = set(terms[:-1]) | set(groups[-1])
+        results = []
+        for key in sorted(scores, key=scores.get, reverse=True)[:limit]:
+            title, body, _ = self._docs[key]
+            # the body around the first match, else the title, else the start of the body
+            snippet = (self._snippet(body, words, terms[-1], True) or self._snippet(title, words, terms[-1], True)
+                       or self._snippet(body, words, terms[-1], False))
+            results.append({"type": SEARCH_FIELDS[key[0]][0], "slug": key[1], "title": title,
+                            "snippet": _highlight(snippet), "score": round(scores[key], 4)})
+        return results
+
+def _fts5_match(terms: List[str]) -> str:
+    # quoted terms are ANDed
+    return " ".join(f'"{t}"' for t in terms)
+
+class SQLiteFTSSearch:
+    """SQLite FTS5 tables in the app database; bm25() ranking, snippet().
+
+    search_fts is porter-stemmed, for whole words. The last query term is a prefix
+    being typed, which a stemmed index can't match once it runs past the stem
+    ("insulat" vs the indexed "insul"), so it goes to search_prefix: the same
+    rows tokenized unstemmed, with prefix indexes. write() takes the caller's
+    session, so index rows commit with the collection rows.
+    """
+    name = "sqlite-fts5"
+    in_db = True
+    TABLES = ("search_fts", "search_prefix")
+
+    async def setup(self):
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+                "tbl UNINDEXED, slug UNINDEXED, title, body, tokenize='porter unicode61')"))
+            await conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search_prefix USING fts5("
+                "tbl UNINDEXED, slug UNINDEXED, title, body, tokenize='unicode61', prefix='2 3 4')"))
+
+    async def replace(self, table: str, docs: List[tuple]):
+        async with engine.begin() as conn:
+            await self.write(conn, table, docs, replace=True)
+
+    async def write(self, conn, table: str, docs: List[tuple], delete: List[str] = (), replace: bool = False):
+        for fts in self.TABLES:
+            if replace:
+                await conn.execute(text(f"DELETE FROM {fts} WHERE tbl = :tbl"), {"tbl": table})
+            else:
+                await self._delete(conn, fts, table, list(delete) + [slug for slug, _, _ in docs])
+            await self._insert(conn, fts, table, docs)
+
+    async def _insert(self, conn, fts: str, table: str, docs: List[tuple]):
+        if docs:
+            await conn.execute(text(f"INSERT INTO {fts} (tbl, slug, title, body) VALUES (:tbl, :slug, :title, :body)"),
+                               [{"tbl": table, "slug": s, "title": t, "body": b} for s, t, b in docs])
+
+    async def _delete(self, conn, fts: str, table: str, slugs: List[str]):
+        if slugs:
+            await conn.execute(text(f"DELETE FROM {fts} WHERE tbl = :tbl AND slug = :slug"),
+                               [{"tbl": table, "slug": s} for s in slugs])
+
+    async def count(self) -> int:
+        # the smaller of the two, so a missing search_prefix (older database) triggers a rebuild
+        async with engine.connect() as conn:
+            return min([(await conn.execute(text(f"SELECT count(*) FROM {fts}"))).scalar() for fts in self.TABLES])
+
+    async def query(self, q: str, table: Optional[str], limit: int) -> List[dict]:
+        terms = _query_terms(q)
+        if not terms:
+            return []
+        # rank and snippet come from the stemmed table when there are whole words,
+        # with the prefix term as a filter; a lone term is ranked on search_prefix
+        fts = "search_fts" if len(terms) > 1 else "search_prefix"
+        prefix = f'"{terms[-1]}"*'
+        sql = (f"SELECT tbl, slug, title, snippet({fts}, -1, :hs, :he, '…', 24) AS snippet, "
+               f"bm25({fts}, 0, 0, {SEARCH_TITLE_WEIGHT}, 1.0) AS rank "
+               f"FROM {fts} WHERE {fts} MATCH :match")
+        params = {"match": _fts5_match(terms[:-1]) if len(terms) > 1 else prefix,
+                  "hs": _HL_START, "he": _HL_END, "limit": limit}
+        if len(terms) > 1:
+            sql += " AND (tbl, slug) IN (SELECT tbl, slug FROM search_prefix WHERE search_prefix MATCH :prefix)"
+            params["prefix"] = prefix
+        if table:
+            sql += " AND tbl = :tbl"
+            params["tbl"] = table
+        async with engine.connect() as conn:
+            rows = (await conn.execute(text(sql + " ORDER BY rank LIMIT :limit"), params)).all()
+        return [{"type": SEARCH_FIELDS[r.tbl][0], "slug": r.slug, "title": r.title,
+                 "snippet": _highlight(r.snippet), "score": round(-r.rank, 4)} for r in rows]
+
+class PostgresSearch:
+    """search_docs table with a weighted tsvector (title A, body B) and a GIN index.
+
+    Postgres has no BM25; ts_rank_cd (cover density, normalised by length) is the
+    closest built-in. Bodies are stored HTML-escaped so ts_headline output is safe.
+    """
+    name = "postgres-tsvector"
+    in_db = True
+    TSV = "setweight(to_tsvector('english', :title), 'A') || setweight(to_tsvector('english', :body), 'B')"
+
+    async def setup(self):
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS search_docs (tbl TEXT NOT NULL, slug TEXT NOT NULL, title TEXT NOT NULL, "
+                "body TEXT NOT NULL, tsv TSVECTOR NOT NULL, PRIMARY KEY (tbl, slug))"))
+            await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_search_docs_tsv ON search_docs USING GIN (tsv)"))
+
+    async def replace(self, table: str, docs: List[tuple]):
+        async with engine.begin() as conn:
+            await self.write(conn, table, docs, replace=True)
+
+    async def write(self, conn, table: str, docs: List[tuple], delete: List[str] = (), replace: bool = False):
+        # conn: the caller's session/connection; the caller commits
+        if replace:
+            await conn.execute(text("DELETE FROM search_docs WHERE tbl = :tbl"), {"tbl": table})
+        elif delete:
+            await conn.execute(text("DELETE FROM search_docs WHERE tbl = :tbl AND slug = ANY(:slugs)"),
+                               {"tbl": table, "slugs": list(delete)})
+        await self._upsert(conn, table, docs)
+
+    async def _upsert(self, conn, table: str, docs: List[tuple]):
+        if docs:
+            await conn.execute(text(
+                f"INSERT INTO search_docs (tbl, slug, title, body, tsv) VALUES (:tbl, :slug, :title, :body, {self.TSV}) "
+                "ON CONFLICT (tbl, slug) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body, tsv = EXCLUDED.tsv"),
+                [{"tbl": table, "slug": s, "title": t, "body": html_escape(b, quote=False)} for s, t, b in docs])
+
+    async def count(self) -> int:
+        async with engine.connect() as conn:
+            return (await conn.execute(text("SELECT count(*) FROM search_docs"))).scalar()
+
+    async def query(self, q: str, table: Optional[str], limit: int) -> List[dict]:
+        terms = _query_terms(q)
+        if not terms:
+            return []
+        sql = ("SELECT tbl, slug, title, ts_rank_cd(tsv, query, 1) AS rank, "
+               "ts_headline('english', body, query, 'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=12') AS snippet "
+               "FROM search_docs, to_tsquery('english', :tsq) AS query WHERE tsv @@ query")
+        params = {"tsq": " & ".join(terms[:-1] + [f"{terms[-1]}:*"]), "limit": limit}
+        if table:
+            sql += " AND tbl = :tbl"
+            params["tbl"] = table
+        async with engine.connect() as conn:
+            rows = (await conn.execute(text(sql + " ORDER BY rank DESC LIMIT :limit"), params)).all()
+        return [{"type": SEARCH_FIELDS[r.tbl][0], "slug": r.slug, "title": r.title,
+                 "snippet": r.snippet, "score": round(float(r.rank), 4)} for r in rows]
+
+async def _make_search_backend(name: str):
+    if name not in ("auto", "memory"):
+        raise RuntimeError(f"Unknown SEARCH_BACKEND: {name}")
+    if name == "auto":
+        backend = {"postgresql": PostgresSearch, "sqlite": SQLiteFTSSearch}.get(engine.dialect.name)
+        if backend is not None:
+            try:
+                backend = backend()
+                await backend.setup()
+                return backend
+            except Exception:
+                pass  # e.g. SQLite built without FTS5
+    return MemorySearch()
+
+SEARCH = MemorySearch()
+SEARCH_STALE = True  # rebuild from the collections before the next query
+
+_SEARCH_REBUILD_LOCK = asyncio.Lock()
+
+async def _searchable_count() -> int:
+    db = SessionLocal()
+    try:
+        return sum([await db.scalar(select(func.count()).select_from(model)) for model in (ServiceItem, BlogPost)])
+    finally:
+        await db.close()
+
+async def _rebuild_search():
+    global SEARCH_STALE
+    async with _SEARCH_REBUILD_LOCK:
+        if not SEARCH_STALE:
+            return
+        db = SessionLocal()
+        try:
+            for model in (ServiceItem, BlogPost):
+                rows = (await db.execute(select(model.slug, model.data).order_by(model.id))).all()
+                await SEARCH.replace(model.__tablename__,
+                                     [(r.slug, *_search_doc(model.__tablename__, r.data)) for r in rows])
+        finally:
+            await db.close()
+        SEARCH_STALE = False
+
+async def _search_write(db, model, upsert: List[tuple] = (), delete: List[str] = (), replace: bool = False):
+    """Index one write in the database backends: (slug, data) pairs to (re)index and slugs to drop.
+
+    Runs on the collection write's own session before it commits, so the index
+    rows land (or roll back) with the collection rows. No-op for MemorySearch.
+    """
+    table = model.__tablename__
+    if table not in SEARCH_FIELDS or not SEARCH.in_db:
+        return
+    docs = [(slug, *_search_doc(table, data)) for slug, data in upsert]
+    await SEARCH.write(db, table, docs, list(delete), replace)
+
+async def _search_update(model, upsert: List[tuple] = (), delete: List[str] = (), replace: bool = False):
+    """Same as _search_write, for the in-process index, after the collection write has committed.
+
+    If the index update fails the index is flagged and rebuilt on the next search
+    instead of failing the write.
+    """
+    global SEARCH_STALE
+    table = model.__tablename__
+    if table not in SEARCH_FIELDS or SEARCH.in_db or SEARCH_STALE:
+        return
+    docs = [(slug, *_search_doc(table, data)) for slug, data in upsert]
+    try:
+        if replace:
+            await SEARCH.replace(table, docs)
+        else:
+            if delete:
+                await SEARCH.delete(table, list(delete))
+            if docs:
+                await SEARCH.upsert(table, docs)
+    except Exception:
+        SEARCH_STALE = True
+
+@app.on_event("startup")
+async def open_search():
+    global SEARCH, SEARCH_STALE
+    SEARCH = await _make_search_backend(SEARCH_BACKEND)
+    # persistent indexes survive restarts and are written with the collections;
+    # refill one that doesn't match them (new table, or rows from an older build)
+    SEARCH_STALE = not SEARCH.in_db or await SEARCH.count() != await _searchable_count()
+
+@app.get("/search")
+async def search(q: str, type: Optional[str] = None, limit: int = 10):
+    tables = {kind: table for table, (kind, _, _) in SEARCH_FIELDS.items()}
+    if type is not None and type not in tables:
+        raise HTTPException(400, f"type must be one of: {', '.join(tables)}")
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise HTTPException(400, f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    if SEARCH_STALE:
+        await _rebuild_search()
+    results = await SEARCH.query(q, tables.get(type), limit)
+    return {"q": q, "backend": SEARCH.name, "results": results}
 
 # -------------------------
 # Upload
 # -------------------------
+class UploadSizeLimit:
+    """ASGI guard for oversized uploads.
+
+    Refuses from Content-Length before the body is read and, for requests without
+    it (chunked), counts body bytes as they arrive: past the cap it answers 413
+    and tells the app the client went away, so the multipart parser stops spooling.
+    """
+
+    def __init__(self, app, path: str, max_bytes: int):
+        self.app = app
+        self.path = path
+        # allow some slack for the multipart envelope
+        self.max_body = max_bytes + 64 * 1024
+        self.max_bytes = max_bytes
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse({"detail": f"File too large (max {self.max_bytes} bytes)"}, status_code=413)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_body:
+            await self._too_large()(scope, receive, send)
+            return
+        received = 0
+        state = {"started": False, "rejected": False}
+
+        async def guarded_receive():
+            nonlocal received
+            if state["rejected"]:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    state["rejected"] = True
+                    if not state["started"]:
+                        await self._too_large()(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if state["rejected"]:
+                return  # our 413 already went out; drop whatever the app sends
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
+
+        await self.app(scope, guarded_receive, guarded_send)
+
+app.add_middleware(UploadSizeLimit, path="/upload-image", max_bytes=UPLOAD_MAX_BYTES)
+
+async def _spool_upload(file: UploadFile, dest: pathlib.Path) -> tuple:
+    """Copy the upload to dest in UPLOAD_CHUNK_BYTES pieces; returns (size, sha256 hex)."""
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        # file writes go through a worker thread, like the reads in StorageClient.upload
+        async with await anyio.open_file(dest, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > UPLOAD_MAX_BYTES:
+                    raise HTTPException(413, f"File too large (max {UPLOAD_MAX_BYTES} bytes)")
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return size, digest.hexdigest()
+
+class StorageClient:
+    """Supabase Storage over one shared httpx.AsyncClient (keep-alive pool)."""
+
+    def __init__(self, base_url: str = SUPABASE_URL, key: str = SUPABASE_KEY, bucket: str = SUPABASE_BUCKET):
+        self.base_url = base_url.rstrip("/")
+        self.bucket = bucket
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {key}"},
+            timeout=httpx.Timeout(STORAGE_TIMEOUT_SEC, connect=10),
+            limits=httpx.Limits(max_connections=STORAGE_MAX_CONNECTIONS,
+                                max_keepalive_connections=STORAGE_MAX_CONNECTIONS),
+        )
+
+    def public_url(self, name: str) -> str:
+        return f"{self.base_url}/storage/v1/object/public/{self.bucket}/{name}"
+
+    async def exists(self, name: str) -> bool:
+        r = await self._client.head(f"/storage/v1/object/public/{self.bucket}/{name}")
+        return r.status_code == 200
+
+    async def get_json(self, name: str) -> Optional[Any]:
+        r = await self._client.get(f"/storage/v1/object/public/{self.bucket}/{name}")
+        if r.status_code != 200:
+            return None
+        try:
+            return r.json()
+        except ValueError:
+            return None  # corrupt/partial manifest: same as none
+
+    async def upload(self, name: str, path: pathlib.Path, content_type: str) -> bool:
+        async def chunks():
+            async with await anyio.open_file(path, "rb") as fh:
+                while True:
+                    chunk = await fh.read(UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    yield chunk
+        r = await self._client.post(
+            f"/storage/v1/object/{self.bucket}/{name}",
+            content=chunks(),
+            headers={
+                "Content-Type": content_type,
+                "Content-Length": str(path.stat().st_size),
+                "x-upsert": "true",
+            },
+        )
+        return 200 <= r.status_code < 300
+
+    async def close(self):
+        await self._client.aclose()
+
+STORAGE: Optional[StorageClient] = None
+
+@app.on_event("startup")
+async def open_storage_client():
+    global STORAGE
+    if SUPABASE_URL and SUPABASE_KEY and STORAGE is None:
+        STORAGE = StorageClient()
+
+@app.on_event("shutdown")
+async def close_storage_client():
+    global STORAGE
+    if STORAGE is not None:
+        await STORAGE.close()
+        STORAGE = None
+
+IMAGE_POOL: Optional[ProcessPoolExecutor] = None
+
+def _image_pool() -> ProcessPoolExecutor:
+    # spawn, not fork: the parent runs an event loop and worker threads
+    global IMAGE_POOL
+    if IMAGE_POOL is None:
+        IMAGE_POOL = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return IMAGE_POOL
+
+@app.on_event("shutdown")
+async def close_image_pool():
+    global IMAGE_POOL
+    if IMAGE_POOL is not None:
+        IMAGE_POOL.shutdown(wait=False, cancel_futures=True)
+        IMAGE_POOL = None
+
+async def _derive_images(src: pathlib.Path, stem: str) -> Optional[tuple]:
+    """(work dir, raw manifest) with the resized variants, or None if src isn't an image."""
+    if not images.available() or not IMAGE_WIDTHS:
+        return None
+    work = pathlib.Path(tempfile.mkdtemp(prefix="evo-img-"))
+    global IMAGE_POOL
+    pool = _image_pool()
+    try:
+        manifest = await asyncio.get_running_loop().run_in_executor(
+            pool, images.make_derivatives, str(src), str(work), stem, IMAGE_WIDTHS)
+    except BrokenProcessPool:
+        # a worker died (e.g. OOM-killed); drop the pool so the next upload gets a fresh one
+        shutil.rmtree(work, ignore_errors=True)
+        if IMAGE_POOL is pool:
+            IMAGE_POOL = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        return None
+    except Exception:
+        shutil.rmtree(work, ignore_errors=True)
+        return None
+    return work, manifest
+
+def _manifest_doc(raw: dict, original: str, url_for) -> dict:
+    # srcset-ready: one srcset string per MIME type, smallest width first
+    variants = [dict(v, url=url_for(v["file"])) for v in raw["variants"]]
+    srcset: Dict[str, List[str]] = {}
+    for v in variants:
+        srcset.setdefault(v["type"], []).append(f'{v["url"]} {v["width"]}w')
+    return {
+        "original": url_for(original),
+        "width": raw["width"],
+        "height": raw["height"],
+        "variants": variants,
+        "srcset": {t: ", ".join(s) for t, s in srcset.items()},
+    }
+
+def _upload_ext(file: UploadFile) -> str:
+    # normalised so the same bytes always map to the same object name
+    ext = pathlib.Path(file.filename or "").suffix.lower()
+    if re.fullmatch(r"\.[a-z0-9]{1,5}", ext):
+        return {".jpeg": ".jpg", ".jpe": ".jpg", ".tif": ".tiff"}.get(ext, ext)
+    return mimetypes.guess_extension(file.content_type or "") or ""
+
+def _upload_result(url: str, manifest: Optional[dict], deduplicated: bool) -> dict:
+    out = {"url": url, "deduplicated": deduplicated}
+    if manifest:
+        out["manifest"] = manifest
+    return out
+
 @app.post("/upload-image")
 async def upload_image(file: UploadFile = File(...), request: Request = None):
     require_admin(request)
-    data = await file.read()
-    filename = f"{int(time.time())}_{file.filename}"
-    # Supabase
-    if SUPABASE_URL and SUPABASE_KEY:
+    content_type = file.content_type or "application/octet-stream"
+    tmp = UPLOADS_DIR / f".{uuid.uuid4().hex}.part"
+    _, digest = await _spool_upload(file, tmp)
+    # content-addressed: same bytes -> same name, so re-uploads are free
+    stem = digest[:32]
+    filename = f"{stem}{_upload_ext(file)}"
+    manifest_name = f"{stem}.manifest.json"
+    derived = None
+    work = None
+
+    async def derive():
+        # (name, path, type) of the variants, and the raw manifest; built at most once
+        nonlocal derived, work
+        if derived is None:
+            result = await _derive_images(tmp, stem)
+            work, raw = result if result else (None, None)
+            files = [(v["file"], work / v["file"], v["type"]) for v in raw["variants"]] if raw else []
+            derived = (files, raw)
+        return derived
+
+    try:
+        # Supabase
+        if STORAGE is not None:
+            try:
+                if await STORAGE.exists(filename):
+                    manifest = await STORAGE.get_json(manifest_name)
+                    return _upload_result(STORAGE.public_url(filename), manifest, True)
+                variants, raw = await derive()
+                uploads = list(variants)
+                manifest = None
+                if raw:
+                    manifest = _manifest_doc(raw, filename, STORAGE.public_url)
+                    (work / manifest_name).write_text(json.dumps(manifest), encoding="utf-8")
+                    uploads.append((manifest_name, work / manifest_name, "application/json"))
+                # original last: once it exists, its variants and manifest do too
+                if all(await asyncio.gather(*(STORAGE.upload(n, p, t) for n, p, t in uploads))) \
+                        and await STORAGE.upload(filename, tmp, content_type):
+                    return _upload_result(STORAGE.public_url(filename), manifest, False)
+            except httpx.HTTPError:
+                pass
+        # Fallback local
+        target = UPLOADS_DIR / filename
+        if target.exists():
+            path = UPLOADS_DIR / manifest_name
+            manifest = json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+            return _upload_result(f"/static/uploads/{filename}", manifest, True)
+        variants, raw = await derive()
+        for name, path, _ in variants:
+            shutil.move(str(path), str(UPLOADS_DIR / name))
+        manifest = None
+        if raw:
+            manifest = _manifest_doc(raw, filename, lambda n: f"/static/uploads/{n}")
+            (UPLOADS_DIR / manifest_name).write_text(json.dumps(manifest), encoding="utf-8")
+        tmp.replace(target)
+        return _upload_result(f"/static/uploads/{filename}", manifest, False)
+    finally:
+        if work is not None:
+            shutil.rmtree(work, ignore_errors=True)
+        tmp.unlink(missing_ok=True)
+
+# -------------------------
+# Mail outbox + background worker
+# -------------------------
+class SMTPPool:
+    """Long-lived, authenticated SMTP connections shared by worker threads.
+
+    A connection is reused until it has been idle for SMTP_IDLE_SEC; a send on a
+    reused connection that turns out to be dead is retried once on a fresh one.
+    """
+
+    def __init__(self, size: int = SMTP_POOL_SIZE, idle_sec: float = SMTP_IDLE_SEC):
+        self.size = max(1, size)
+        self.idle_sec = idle_sec
+        self._idle: List[tuple] = []  # (smtplib.SMTP, last_used)
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reuses = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        s = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=20)
         try:
-            url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{filename}"
-            r = requests.post(
-                url,
-                data=data,
-                headers={
-                    "Authorization": f"Bearer {SUPABASE_KEY}",
-                    "Content-Type": file.content_type or "application/octet-stream",
-                    "x-upsert": "true"
-                },
-                timeout=30
-            )
-            if 200 <= r.status_code < 300:
-                public = f"{SUPABASE_URL}/storage/v1/object/public/{SUPABASE_BUCKET}/{filename}"
-                return {"url": public}
+            if SMTP_USE_TLS:
+                s.starttls()
+            if SMTP_USER:
+                s.login(SMTP_USER, SMTP_PASS)
+        except Exception:
+            self._discard(s)
+            raise
+        with self._lock:
+            self.connects += 1
+        return s
+
+    @staticmethod
+    def _discard(s: smtplib.SMTP):
+        try:
+            s.quit()
         except Exception:
-            pass
-    # Fallback local
-    (UPLOADS_DIR / filename).write_bytes(data)
-    return {"url": f"/static/uploads/{filename}"}
+            s.close()
+
+    def _acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                s, last_used = self._idle.pop()
+                if now - last_used < self.idle_sec:
+                    self.reuses += 1
+                    return s, True
+                self._discard(s)
+        return self._connect(), False
+
+    def _release(self, s: smtplib.SMTP):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((s, time.monotonic()))
+                return
+        self._discard(s)
+
+    def send(self, to_addr: str, msg: bytes):
+        s, reused = self._acquire()
+        try:
+            s.sendmail(EMAIL_FROM, [to_addr], msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            s.close()
+            if not reused:
+                raise
+            s = self._connect()
+            try:
+                s.sendmail(EMAIL_FROM, [to_addr], msg)
+            except Exception:
+                self._discard(s)
+                raise
+        except Exception:
+            self._discard(s)
+            raise
+        self._release(s)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for s, _ in idle:
+            self._discard(s)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"idle": len(self._idle), "size": self.size, "connects": self.connects, "reuses": self.reuses}
+
+SMTP_POOL = SMTPPool()
+
+def _smtp_send(to_addr: str, subject: str, body: str):
+    # blocking; only ever called from a worker thread
+    msg = f"From: {EMAIL_FROM}\r\nTo: {to_addr}\r\nSubject: {subject}\r\n\r\n{body}"
+    SMTP_POOL.send(to_addr, msg.encode("utf-8"))
+
+class MailWorker:
+    """Drains email_outbox in the background; rows survive restarts until sent."""
+
+    LEASE = timedelta(minutes=2)
+
+    def __init__(self, digest_sec: float = MAIL_DIGEST_SEC):
+        self.digest_sec = digest_sec
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._next_wait = MAIL_POLL_SEC
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(SMTP_POOL.close)
+
+    def notify(self):
+        self._wake.set()
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                await self.drain()
+            except Exception as e:
+                # keep the worker alive; rows are retried on the next pass, but say so
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"[:300]
+                log.warning("mail worker pass failed, retrying in %ss: %s", self._next_wait, e, exc_info=True)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._next_wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, db, limit: int = 20) -> List[OutboxEmail]:
+        # lease rows so other workers/processes skip them while we send
+        now = datetime.utcnow()
+        due = (await db.execute(
+            select(OutboxEmail.id, OutboxEmail.created_at)
+            .where(OutboxEmail.sent_at.is_(None), OutboxEmail.attempts < MAIL_MAX_ATTEMPTS,
+                   OutboxEmail.next_attempt_at <= now)
+            .order_by(OutboxEmail.id).limit(limit if self.digest_sec <= 0 else 500)
+        )).all()
+        if due and self.digest_sec > 0:
+            # digest: hold the batch until its oldest lead is digest_sec old
+            wait = self.digest_sec - (now - due[0].created_at).total_seconds()
+            if wait > 0:
+                self._next_wait = min(MAIL_POLL_SEC, wait)
+                return []
+        self._next_wait = MAIL_POLL_SEC
+        ids = [r.id for r in due]
+        claimed = []
+        for i in ids:
+            res = await db.execute(
+                update(OutboxEmail)
+                .where(OutboxEmail.id == i, OutboxEmail.sent_at.is_(None), OutboxEmail.next_attempt_at <= now)
+                .values(next_attempt_at=now + self.LEASE)
+            )
+            if res.rowcount == 1:
+                claimed.append(i)
+        await db.commit()
+        if not claimed:
+            return []
+        return list((await db.scalars(select(OutboxEmail).where(OutboxEmail.id.in_(claimed)))).all())
+
+    async def drain(self) -> int:
+        sent = 0
+        db = SessionLocal()
+        try:
+            while True:
+                batch = await self._claim(db)
+                if not batch:
+                    return sent
+                for group in self._group(batch):
+                    first = group[0]
+                    if len(group) == 1:
+                        subject, body = first.subject, first.body
+                    else:
+                        subject = f"{len(group)} New Website Leads"
+                        body = ("\n" + "-" * 40 + "\n").join(f"[{r.created_at:%Y-%m-%d %H:%M} UTC]\n{r.body}" for r in group)
+                    try:
+                        await asyncio.to_thread(_smtp_send, first.to_addr, subject, body)
+                        for row in group:
+                            row.sent_at = datetime.utcnow()
+                            row.last_error = None
+                        sent += len(group)
+                    except Exception as e:
+                        for row in group:
+                            row.attempts = (row.attempts or 0) + 1
+                            row.last_error = str(e)[:1000]
+                            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=min(30 * 2 ** row.attempts, 3600))
+                    await db.commit()
+        finally:
+            await db.close()
+
+    def _group(self, rows: List[OutboxEmail]) -> List[List[OutboxEmail]]:
+        if self.digest_sec <= 0:
+            return [[r] for r in rows]
+        groups: Dict[str, List[OutboxEmail]] = {}
+        for r in rows:
+            groups.setdefault(r.to_addr, []).append(r)
+        return list(groups.values())
+
+MAIL_WORKER = MailWorker()
+
+@app.on_event("startup")
+async def start_mail_worker():
+    if SMTP_HOST:
+        MAIL_WORKER.start()
+
+@app.on_event("shutdown")
+async def stop_mail_worker():
+    await MAIL_WORKER.stop()
 
 # -------------------------
 # Lead
@@ -433,26 +2400,23 @@ async def upload_image(file: UploadFile = File(...), request: Request = None):
 @app.post("/lead")
 async def create_lead(body: LeadSchema, request: Request):
     ip = request.client.host if request and request.client else "unknown"
-    if rate_limited(ip):
+    if await rate_limited(ip):
         raise HTTPException(429, "Too many requests")
     db = SessionLocal()
     try:
         lead = Lead(name=body.name, email=str(body.email), phone=body.phone or "", message=body.message or "")
-        db.add(lead); db.commit()
+        db.add(lead)
+        # notification goes out via the outbox, committed with the lead
+        if SMTP_HOST:
+            db.add(OutboxEmail(
+                to_addr=LEADS_TO_EMAIL,
+                subject="New Website Lead",
+                body=f"Name: {body.name}\nEmail: {body.email}\nPhone: {body.phone}\nMessage:\n{body.message}\n",
+            ))
+        await db.commit()
     finally:
-        db.close()
-    # Email (best-effort)
-    if SMTP_HOST and SMTP_USER and SMTP_PASS:
-        try:
-            msg = f"From: {EMAIL_FROM}\r\nTo: {LEADS_TO_EMAIL}\r\nSubject: New Website Lead\r\n\r\n" \
-                  f"Name: {body.name}\nEmail: {body.email}\nPhone: {body.phone}\nMessage:\n{body.message}\n"
-            with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=20) as s:
-                s.starttls()
-                s.login(SMTP_USER, SMTP_PASS)
-                s.sendmail(EMAIL_FROM, [LEADS_TO_EMAIL], msg.encode("utf-8"))
-        except Exception:
-            # swallow email errors (lead still stored)
-            pass
+        await db.close()
+    MAIL_WORKER.notify()
     return {"ok": True}
 
 # -------------------------
@@ -468,6 +2432,7 @@ def debug_seed_files():
         return {"used_folder": False, "singletons": [], "arrays": [], "errors": ["seed_data folder not found"]}
     singletons = []
     arrays = []
+    pages = []
     errors = []
     for f in root.glob("*.json"):
         try:
@@ -478,13 +2443,63 @@ def debug_seed_files():
                 singletons.append(f.stem)
         except Exception as e:
             errors.append(f"{f.name}: {e}")
-    return {"used_folder": True, "singletons": singletons, "arrays": arrays, "errors": errors}
+    for f in (root / "pages").glob("*.json"):
+        try:
+            _validate_page(_read_json(f))
+            pages.append(f.stem)
+        except Exception as e:
+            errors.append(f"pages/{f.name}: {e}")
+    return {"used_folder": True, "singletons": singletons, "arrays": arrays, "pages": pages, "errors": errors}
+
+@app.get("/debug/db-pool")
+def debug_db_pool():
+    pool = engine.pool
+    info = {"class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        info.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        info.update({"max_overflow": DB_MAX_OVERFLOW, "timeout": DB_POOL_TIMEOUT,
+                     "recycle": DB_POOL_RECYCLE, "pre_ping": DB_POOL_PRE_PING})
+    info.update(POOL_STATS.snapshot())
+    return info
+
+@app.get("/debug/outbox")
+async def debug_outbox():
+    db = SessionLocal()
+    try:
+        pending = await db.scalar(select(func.count(OutboxEmail.id)).where(
+            OutboxEmail.sent_at.is_(None), OutboxEmail.attempts < MAIL_MAX_ATTEMPTS))
+        failed = await db.scalar(select(func.count(OutboxEmail.id)).where(
+            OutboxEmail.sent_at.is_(None), OutboxEmail.attempts >= MAIL_MAX_ATTEMPTS))
+        sent = await db.scalar(select(func.count(OutboxEmail.id)).where(OutboxEmail.sent_at.is_not(None)))
+    finally:
+        await db.close()
+    return {"worker_running": MAIL_WORKER._task is not None, "digest_sec": MAIL_WORKER.digest_sec,
+            "pending": pending, "failed": failed, "sent": sent, "worker_errors": MAIL_WORKER.errors,
+            "last_error": MAIL_WORKER.last_error, "smtp_pool": SMTP_POOL.stats()}
+
+@app.get("/debug/rate-limit")
+def debug_rate_limit():
+    return {"backend": RATE_LIMIT_BACKEND, "limit": POST_LIMIT_COUNT, "window_sec": POST_LIMIT_WINDOW,
+            **RATE_LIMIT_STATS}
+
+@app.get("/debug/cache")
+def debug_cache():
+    return {"content": CONTENT_CACHE.stats(), "collections": COLLECTION_CACHE.stats(),
+            "queries": QUERY_CACHE.stats(), "items": ITEM_CACHE.stats(),
+            "bootstrap": BOOTSTRAP_CACHE.stats(), "pages": PAGE_CACHE.stats(),
+            "pages_html": PAGE_HTML_CACHE.stats()}
 
 @app.post("/seed")
 async def seed(request: Request):
     require_admin(request)
     root = pathlib.Path("seed_data")
-    report = {"used_folder": False, "bootstrapped": False, "singletons": [], "arrays": [], "errors": []}
+    report = {"used_folder": False, "bootstrapped": False, "singletons": [], "arrays": [], "pages": [], "errors": []}
     if not root.exists():
         return report
     report["used_folder"] = True
@@ -497,32 +2512,39 @@ async def seed(request: Request):
                 if isinstance(data, list):
                     continue
                 key = f.stem
-                obj = db.query(Content).filter(Content.key==key).first()
-                if obj: obj.data = data
-                else: db.add(Content(key=key, data=data))
-                db.commit()
+                await _upsert_content(db, key, data)
+                CONTENT_CACHE.set(key, EncodedBody(data))
+                BOOTSTRAP_CACHE.invalidate()
                 report["singletons"].append(key)
             except Exception as e:
                 report["errors"].append(f"{f.name}: {e}")
 
         # arrays we know: services/blogs/gallery
-        def load_array(name, model, unique):
+        async def load_array(name, model, unique):
             p = root / f"{name}.json"
             if not p.exists(): return
             try:
                 items = _read_json(p)
                 if not isinstance(items, list):
                     raise Exception("Array file must be a JSON array")
-                _replace_collection(db, model, items, unique)
-                report["arrays"].append({"name": name, "count": len(items)})
+                stats = await _replace_collection(db, model, items, unique)
+                report["arrays"].append({"name": name, "count": len(items), "ms": stats["ms"]})
             except Exception as e:
                 report["errors"].append(f"{name}.json: {e}")
 
-        load_array("services", ServiceItem, "slug")
-        load_array("blogs", BlogPost, "slug")
-        load_array("gallery", GalleryItem, "title")
+        await load_array("services", ServiceItem, "slug")
+        await load_array("blogs", BlogPost, "slug")
+        await load_array("gallery", GalleryItem, "title")
+
+        # block pages: seed_data/pages/<slug>.json
+        for f in (root / "pages").glob("*.json"):
+            try:
+                await _save_page(db, f.stem, _read_json(f))
+                report["pages"].append(f.stem)
+            except Exception as e:
+                report["errors"].append(f"pages/{f.name}: {e}")
     finally:
-        db.close()
+        await db.close()
     return report
 
 # -------------------------
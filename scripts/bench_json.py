@@ -0,0 +1,71 @@
+# scripts/bench_json.py
+# JSON serialization benchmark: stdlib json vs orjson, for the two biggest
+# payloads (/services and /content/homepage_data).
+#   1. encode-only ops/sec on the seed data
+#   2. requests/sec through the ASGI app (in-process, no network):
+#      "cached"      - normal path, body pre-encoded once per write
+#      "cold/stdlib" - cache dropped before every request, stdlib encoder
+#      "cold/orjson" - cache dropped before every request, orjson encoder
+# run from the repo root:  python scripts/bench_json.py [seconds per case]
+import os
+import sys
+import json
+import time
+import asyncio
+import pathlib
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+from app import main
+
+PATHS = ["/services", "/content/homepage_data"]
+
+def encode_bench(seconds: float):
+    payloads = {
+        "/services": json.loads((ROOT / "seed_data/services.json").read_text(encoding="utf-8")),
+        "/content/homepage_data": json.loads((ROOT / "seed_data/homepage_data.json").read_text(encoding="utf-8")),
+    }
+    encoders = {"stdlib": lambda o: json.dumps(o, ensure_ascii=False, separators=(",", ":")).encode("utf-8")}
+    if main.orjson is not None:
+        encoders["orjson"] = lambda o: main.orjson.dumps(o, option=main.orjson.OPT_NON_STR_KEYS)
+    for path, obj in payloads.items():
+        for name, enc in encoders.items():
+            n, started = 0, time.perf_counter()
+            while time.perf_counter() - started < seconds:
+                enc(obj)
+                n += 1
+            print(f"encode {path:<24} {name:<7} {n / (time.perf_counter() - started):>10.0f} ops/s")
+
+async def request_bench(seconds: float):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await main.create_tables()
+        token = (await client.post("/auth/login", json={"email": main.ADMIN_EMAIL, "password": main.ADMIN_PASSWORD})).json()["access_token"]
+        await client.post("/seed", headers={"Authorization": f"Bearer {token}"})
+        real_orjson = main.orjson
+        cases = [("cached", real_orjson, False), ("cold/stdlib", None, True)]
+        if real_orjson is not None:
+            cases.append(("cold/orjson", real_orjson, True))
+        for path in PATHS:
+            for label, encoder, cold in cases:
+                main.orjson = encoder
+                n, started = 0, time.perf_counter()
+                while time.perf_counter() - started < seconds:
+                    if cold:
+                        main.CONTENT_CACHE.invalidate()
+                        main.COLLECTION_CACHE.invalidate()
+                    r = await client.get(path, headers={"Accept-Encoding": "identity"})
+                    assert r.status_code == 200
+                    n += 1
+                print(f"GET    {path:<24} {label:<12} {n / (time.perf_counter() - started):>8.0f} req/s")
+        main.orjson = real_orjson
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    encode_bench(seconds)
+    asyncio.run(request_bench(seconds))
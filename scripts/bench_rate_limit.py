@@ -0,0 +1,32 @@
+# scripts/bench_rate_limit.py
+# Microbenchmark for the /lead rate limiter: per-call cost with 100k distinct IPs.
+# run from the repo root:  python scripts/bench_rate_limit.py [clients] [calls]
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+from app.main import SlidingWindowLimiter
+
+def bench(clients: int, calls: int, max_clients: int):
+    ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(clients)]
+    limiter = SlidingWindowLimiter(limit=30, window=60, max_clients=max_clients)
+    # warm up: every client seen once
+    now = 1_000_000.0
+    for ip in ips:
+        limiter.hit(ip, now)
+    picks = [random.choice(ips) for _ in range(calls)]
+    started = time.perf_counter()
+    for i, ip in enumerate(picks):
+        limiter.hit(ip, now + i * 1e-4)
+    elapsed = time.perf_counter() - started
+    return elapsed / calls * 1e9, len(limiter)
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    for cap in (clients, clients // 10):
+        ns, tracked = bench(clients, calls, cap)
+        print(f"clients={clients} cap={cap} calls={calls}: {ns:.0f} ns/call, tracked={tracked}")
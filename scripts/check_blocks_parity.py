@@ -0,0 +1,74 @@
+# scripts/check_blocks_parity.py
+# Parity check: app/blocks.render() must produce the same HTML as render() in
+# admin_static/blocks-renderer.js. Runs the JS functions under node on every
+# seed_data/pages/*.json plus a sample covering each block type, and diffs.
+# run from the repo root:  python scripts/check_blocks_parity.py   (needs node)
+import sys
+import json
+import difflib
+import pathlib
+import subprocess
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.blocks import render
+
+SAMPLE = [
+    {"type": "hero", "props": {"title": "Tom & Jerry's <Roofing>", "subtitle": 'Say "hi"', "ctaHref": "/quote?a=1&b=2",
+                               "images": ["/static/uploads/a.jpg"]}},
+    {"type": "hero", "props": {"title": "", "images": []}},
+    {"type": "text", "props": {"html": "<p>raw <b>html</b></p>"}},
+    {"type": "image", "props": {"src": "/x.png", "alt": "An <alt>"}},
+    {"type": "image", "props": {}},
+    {"type": "columns", "props": {"left": "<p>L</p>"}},
+    {"type": "cta", "props": {"text": "Call us", "href": "tel:123", "button": ""}},
+    {"type": "cta", "props": {"text": "No button"}},
+    {"type": "features", "props": {"heading": "Why us", "items": ["Fast", "Insured & local"]}},
+    {"type": "features", "props": {}},
+    {"type": "faq", "props": {"items": [{"q": "How long?", "a": "2 <days>"}, {"q": "Cost?"}]}},
+    {"type": "testimonials", "props": {"items": [{"quote": "Great", "author": "A. B.", "role": "Owner", "image": "/t.jpg"},
+                                                 {"quote": "Good"}]}},
+    {"type": "galleryStrip", "props": {"images": [f"/g{i}.jpg" for i in range(9)], "count": 4}},
+    {"type": "galleryStrip", "props": {"images": ["/g.jpg"]}},
+    {"type": "spacer", "props": {"size": 24}},
+    {"type": "spacer", "props": {"size": "12"}},
+    {"type": "spacer"},
+    {"type": "divider", "props": {}},
+    {"type": "map", "props": {"src": "https://maps.example/?q=a&b"}},
+    {"type": "video", "props": {}},
+    {"type": "form", "props": {"heading": "Get a quote"}},
+    {"type": "mystery", "props": {"x": [1, 2], "y": {"z": "<é>"}, "n": None, "ok": True}},
+]
+
+NODE = r"""
+const src = require("fs").readFileSync(process.argv[1], "utf8");
+const start = src.indexOf("  function esc(");
+const end = src.indexOf("  // tiny lead helper");
+const render = new Function(src.slice(start, end) + "\nreturn render;")();
+const cases = JSON.parse(require("fs").readFileSync(0, "utf8"));
+process.stdout.write(JSON.stringify(cases.map(render)));
+"""
+
+def main() -> int:
+    cases = {"sample": SAMPLE}
+    for f in sorted((ROOT / "seed_data/pages").glob("*.json")):
+        cases[f"pages/{f.name}"] = json.loads(f.read_text(encoding="utf-8"))["blocks"]
+    out = subprocess.run(
+        ["node", "-e", NODE, str(ROOT / "admin_static/blocks-renderer.js")],
+        input=json.dumps(list(cases.values())), capture_output=True, text=True, check=True,
+    )
+    failed = 0
+    for (name, blocks), expected in zip(cases.items(), json.loads(out.stdout)):
+        got = render(blocks)
+        if got == expected:
+            print(f"ok    {name} ({len(got)} chars)")
+            continue
+        failed += 1
+        print(f"FAIL  {name}")
+        sys.stdout.writelines(difflib.unified_diff(
+            expected.splitlines(True), got.splitlines(True), "blocks-renderer.js", "app/blocks.py"))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# scripts/check_mail_outbox.py
+# End-to-end check of the lead outbox against a local aiosmtpd server:
+#   1. leads posted while the SMTP server is down stay queued (attempts counted)
+#   2. once it is up, the worker delivers every queued lead
+#   3. follow-up leads reuse the pooled SMTP connection (few connects, many reuses)
+# run from the repo root:  python scripts/check_mail_outbox.py   (needs aiosmtpd)
+import os
+import sys
+import time
+import socket
+import asyncio
+import pathlib
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from aiosmtpd.controller import Controller
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+PORT = _free_port()
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/outbox.db",
+    SMTP_HOST="127.0.0.1", SMTP_PORT=str(PORT), SMTP_USE_TLS="false", SMTP_USER="",
+    MAIL_POLL_SEC="0.2", MAIL_DIGEST_SEC="0", LEADS_TO_EMAIL="office@example.com",
+)
+
+import httpx
+from app import main
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content.decode("utf-8", "replace"))
+        return "250 OK"
+
+async def _wait_for(predicate, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+async def _outbox() -> dict:
+    async with main.engine.connect() as conn:
+        rows = (await conn.execute(main.select(main.OutboxEmail.sent_at, main.OutboxEmail.attempts))).all()
+    return {"queued": sum(r.sent_at is None for r in rows), "sent": sum(r.sent_at is not None for r in rows),
+            "attempts": sum(r.attempts or 0 for r in rows)}
+
+async def run() -> list:
+    failures = []
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'}  {what}")
+        if not ok:
+            failures.append(what)
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    transport = httpx.ASGITransport(app=main.app)
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=PORT)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            # 1. server down: the request still succeeds, the email stays queued
+            started = time.perf_counter()
+            r = await client.post("/lead", json={"name": "Down", "email": "down@example.com", "message": "queued"})
+            check(r.status_code == 200 and time.perf_counter() - started < 1.0, "/lead returns without waiting for SMTP")
+            check(await _wait_for(lambda: _attempts_at_least(1)), "failed send is recorded on the outbox row")
+            check((await _outbox())["queued"] == 1, "lead email stays queued while SMTP is down")
+
+            # 2. server up: the queued row is delivered (retry is due after its backoff; force it now)
+            controller.start()
+            async with main.engine.begin() as conn:
+                await conn.execute(main.update(main.OutboxEmail).values(next_attempt_at=main.datetime.utcnow()))
+            main.MAIL_WORKER.notify()
+            check(await _wait_for(lambda: _sent_at_least(1)), "queued email delivered once SMTP is back")
+
+            # 3. more leads go over the pooled connection
+            for i in range(4):
+                r = await client.post("/lead", json={"name": f"Lead {i}", "email": f"l{i}@example.com", "message": "hi"})
+                check(r.status_code == 200, f"lead {i} accepted")
+            check(await _wait_for(lambda: _sent_at_least(5)), "all 5 lead emails delivered")
+            check(len(inbox.messages) == 5 and "Subject: New Website Lead" in inbox.messages[-1],
+                  f"aiosmtpd received 5 messages (got {len(inbox.messages)})")
+            stats = main.SMTP_POOL.stats()
+            check(stats["connects"] <= 2 and stats["reuses"] >= 3, f"SMTP connections reused: {stats}")
+    finally:
+        for handler in main.app.router.on_shutdown:
+            await handler()
+        controller.stop()
+    return failures
+
+async def _attempts_at_least(n: int) -> bool:
+    return (await _outbox())["attempts"] >= n
+
+async def _sent_at_least(n: int) -> bool:
+    return (await _outbox())["sent"] >= n
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(run()) else 0)
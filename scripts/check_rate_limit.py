@@ -0,0 +1,88 @@
+# scripts/check_rate_limit.py
+# Checks the shared /lead rate-limit backends, each as two "workers" (two backend
+# instances on one store) taking turns:
+#   1. sqlite: a temp file; redis: a local fakeredis server speaking the Redis protocol
+#   2. RATE_LIMIT_COUNT=5, 8 posts from one IP: 5 allowed, 3 rejected, none failing open
+#   3. a Redis backend that can't load its script refuses to start
+# run from the repo root:  python scripts/check_rate_limit.py   (needs fakeredis[lua])
+import os
+import sys
+import socket
+import asyncio
+import pathlib
+import tempfile
+import threading
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+TMP = tempfile.mkdtemp()
+os.environ.update(DATABASE_URL=f"sqlite:///{TMP}/rl.db", RATE_LIMIT_COUNT="5", RATE_LIMIT_WINDOW_SEC="60",
+                  RATE_LIMIT_BACKEND="memory", SMTP_HOST="")
+
+from fakeredis import TcpFakeServer
+
+import httpx
+from app import main
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def run(redis_url: str) -> list:
+    failures = []
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'}  {what}")
+        if not ok:
+            failures.append(what)
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            backends = {
+                "sqlite": lambda: main.SQLiteRateLimit(path=f"{TMP}/ratelimit.db"),
+                "redis": lambda: main.RedisRateLimit(url=redis_url),
+            }
+            for name, make in backends.items():
+                workers = [make(), make()]
+                for w in workers:
+                    await w.setup()
+                errors = main.RATE_LIMIT_STATS["backend_errors"]
+                codes = []
+                for i in range(8):
+                    main.RATE_LIMIT = workers[i % 2]
+                    r = await client.post("/lead", json={"name": "Rate", "email": "rate@example.com", "message": str(i)})
+                    codes.append(r.status_code)
+                check(codes == [200] * 5 + [429] * 3, f"{name}: two workers share the limit {codes}")
+                check(main.RATE_LIMIT_STATS["backend_errors"] == errors, f"{name}: no fail-open")
+                check(not await workers[0].hit("another-ip"), f"{name}: other IPs unaffected")
+                for w in workers:
+                    await w.close()
+
+            main.RATE_LIMIT = main.RedisRateLimit(url=f"redis://127.0.0.1:{_free_port()}/0")
+            try:
+                await main.open_rate_limit()
+                check(False, "unusable redis backend refuses to start")
+            except RuntimeError as e:
+                check("not usable" in str(e), f"unusable redis backend refuses to start: {str(e)[:90]}")
+            await main.RATE_LIMIT.close()
+    finally:
+        main.RATE_LIMIT = main.MemoryRateLimit(main.RATE_LIMITER)
+        for handler in main.app.router.on_shutdown:
+            await handler()
+    return failures
+
+def main_() -> int:
+    port = _free_port()
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        return 1 if asyncio.run(run(f"redis://127.0.0.1:{port}/0")) else 0
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    sys.exit(main_())
@@ -0,0 +1,82 @@
+# scripts/check_search.py
+# Checks /search on the seeded content with each backend this database supports
+# (SQLite FTS5 and the in-process index):
+#   1. whole words and multi-word queries find the expected docs
+#   2. type-ahead: a last word cut off past its stem ("insulat", "roofin") still matches
+#   3. a saved service is searchable at once, and gone once removed
+# run from the repo root:  python scripts/check_search.py
+import os
+import sys
+import asyncio
+import pathlib
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/search.db"
+
+import httpx
+from app import main
+
+# query -> a slug that must be among the results
+EXPECTED = {
+    "insulation": "insulate-home-properly-costs-benefits-mistakes",
+    "solar": "solar-power",
+    "heat pu": "air-source-heat-pump",
+    "solar pan": "solar-power",
+}
+# partial last words; each must find the same docs as the longest whole word it starts
+PARTIAL = {
+    "insulation": ["insul", "insula", "insulat", "insulati", "insulatio"],
+    "roofing": ["roofi", "roofin"],
+    "rendering": ["rende", "renderin"],
+}
+
+async def run() -> list:
+    failures = []
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'}  {what}")
+        if not ok:
+            failures.append(what)
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            token = (await client.post("/auth/login", json={"email": main.ADMIN_EMAIL,
+                                                             "password": main.ADMIN_PASSWORD})).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            check((await client.post("/seed", headers=headers)).status_code == 200, "seeded")
+
+            async def slugs(q: str) -> list:
+                r = await client.get("/search", params={"q": q, "limit": main.SEARCH_MAX_LIMIT})
+                return [x["slug"] for x in r.json()["results"]] if r.status_code == 200 else []
+
+            for backend in ("auto", "memory"):
+                main.SEARCH_BACKEND = backend
+                await main.open_search()
+                name = main.SEARCH.name
+                for q, slug in EXPECTED.items():
+                    check(slug in await slugs(q), f"{name}: {q!r} finds {slug}")
+                for word, partials in PARTIAL.items():
+                    full = set(await slugs(word))
+                    check(bool(full), f"{name}: {word!r} has results")
+                    for p in partials:
+                        found = set(await slugs(p))
+                        check(full <= found, f"{name}: {p!r} finds all {len(full)} {word!r} docs ({len(found)} results)")
+
+                item = {"slug": "xylo", "name": "Xylophone Cladding", "description": "Musical cladding"}
+                await client.post("/services", headers=headers, json=item)
+                check("xylo" in await slugs("xyloph"), f"{name}: saved service is searchable at once")
+                services = [s for s in (await client.get("/services")).json() if s.get("slug") != "xylo"]
+                await client.post("/services?mode=diff", headers=headers, json=services)
+                check("xylo" not in await slugs("xyloph"), f"{name}: removed service drops out")
+    finally:
+        for handler in main.app.router.on_shutdown:
+            await handler()
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(run()) else 0)
@@ -0,0 +1,140 @@
+# scripts/check_storage_client.py
+# Checks /upload-image against a local stub of the Supabase /storage/v1/object API:
+#   1. uploads (original + derivatives + manifest) land in the stub bucket
+#   2. consecutive uploads reuse pooled keep-alive connections
+#   3. re-uploading the same bytes is deduplicated via HEAD, no new POSTs
+#   4. a corrupt manifest in the bucket does not fail the upload
+# run from the repo root:  python scripts/check_storage_client.py
+import io
+import os
+import sys
+import socket
+import asyncio
+import pathlib
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+KEY = "stub-service-key"
+
+class StorageStub(BaseHTTPRequestHandler):
+    """POST /storage/v1/object/<bucket>/<name>, HEAD/GET .../object/public/<bucket>/<name>."""
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    objects: dict = {}
+    connections: set = set()
+    posts = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code: int, body: bytes = b"{}", head: bool = False):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def do_POST(self):
+        StorageStub.connections.add(self.client_address)
+        StorageStub.posts += 1
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Authorization") != f"Bearer {KEY}" or not self.path.startswith("/storage/v1/object/"):
+            return self._reply(400, b'{"error":"bad request"}')
+        StorageStub.objects[self.path[len("/storage/v1/object/"):]] = body
+        self._reply(200, b'{"Key":"ok"}')
+
+    def _public(self, head: bool):
+        StorageStub.connections.add(self.client_address)
+        name = self.path[len("/storage/v1/object/public/"):]
+        if name in StorageStub.objects:
+            self._reply(200, StorageStub.objects[name], head)
+        else:
+            self._reply(400, b'{"error":"not found"}', head)
+
+    def do_HEAD(self):
+        self._public(True)
+
+    def do_GET(self):
+        self._public(False)
+
+def _sample_image() -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        return os.urandom(4096)  # not decodable: no derivatives, original only
+    buf = io.BytesIO()
+    Image.new("RGB", (800, 500), (40, 120, 200)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+async def run(base_url: str) -> list:
+    import httpx
+    from app import main
+
+    failures = []
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'}  {what}")
+        if not ok:
+            failures.append(what)
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    try:
+        check(main.STORAGE is not None, "storage client created at startup")
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            token = (await client.post("/auth/login", json={"email": main.ADMIN_EMAIL,
+                                                             "password": main.ADMIN_PASSWORD})).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            image = _sample_image()
+
+            async def upload(data: bytes, name: str = "photo.jpg"):
+                return await client.post("/upload-image", headers=headers, files={"file": (name, data, "image/jpeg")})
+
+            r = await upload(image)
+            body = r.json()
+            check(r.status_code == 200 and body["url"].startswith(base_url) and not body["deduplicated"],
+                  f"first upload stored in the stub: {body.get('url')}")
+            original = body["url"].split("/object/public/", 1)[1]
+            check(StorageStub.objects.get(original) == image, "stub holds the original bytes")
+
+            for i in range(3):
+                r = await upload(image + bytes([i]), f"other{i}.jpg")
+                check(r.status_code == 200, f"upload {i + 2} ok")
+            check(len(StorageStub.connections) <= main.STORAGE_MAX_CONNECTIONS,
+                  f"{StorageStub.posts} POSTs over {len(StorageStub.connections)} pooled connection(s)")
+
+            posts = StorageStub.posts
+            r = await upload(image, "again.jpg")
+            check(r.status_code == 200 and r.json()["deduplicated"] and StorageStub.posts == posts,
+                  "same bytes again: deduplicated, nothing re-posted")
+
+            manifest = original.rsplit(".", 1)[0] + ".manifest.json"
+            StorageStub.objects[manifest] = b'{"variants": ['  # truncated JSON
+            r = await upload(image, "corrupt.jpg")
+            check(r.status_code == 200 and r.json()["deduplicated"], f"corrupt manifest tolerated ({r.status_code})")
+    finally:
+        for handler in main.app.router.on_shutdown:
+            await handler()
+    return failures
+
+def main() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = ThreadingHTTPServer(("127.0.0.1", port), StorageStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{port}"
+    os.environ.update(DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/storage.db",
+                      SUPABASE_URL=base_url, SUPABASE_KEY=KEY, SUPABASE_BUCKET="public")
+    try:
+        return 1 if asyncio.run(run(base_url)) else 0
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# scripts/precompress_static.py
+# Write .gz (and .br, if the brotli module is installed) next to text assets so
+# the static mounts can serve them without compressing per request.
+# run from the repo root:  python scripts/precompress_static.py admin_static [more dirs...]
+import sys
+import gzip
+import pathlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+EXTENSIONS = {".html", ".js", ".css", ".json", ".svg", ".txt", ".xml"}
+MIN_BYTES = 512
+
+def precompress(root: pathlib.Path):
+    for f in sorted(root.rglob("*")):
+        if not f.is_file() or f.suffix not in EXTENSIONS:
+            continue
+        data = f.read_bytes()
+        if len(data) < MIN_BYTES:
+            continue
+        outputs = [(f.with_name(f.name + ".gz"), lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+        if brotli:
+            outputs.append((f.with_name(f.name + ".br"), lambda d: brotli.compress(d, quality=11)))
+        for out, compress in outputs:
+            if out.exists() and out.stat().st_mtime >= f.stat().st_mtime:
+                continue
+            packed = compress(data)
+            if len(packed) < len(data):
+                out.write_bytes(packed)
+                print(f"{out} ({len(data)} -> {len(packed)} bytes)")
+
+if __name__ == "__main__":
+    for d in sys.argv[1:] or ["admin_static"]:
+        precompress(pathlib.Path(d))